@@ -5,15 +5,16 @@ orchestra_composer_fixed.py
 """
 
 import os
-import random
+import atexit
+import numpy as np
 from midiutil import MIDIFile
-import pygame
 import subprocess
 import shutil
 
 # ===================== SETTINGS =====================
 OUTPUT_DIR = "orchestra_output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+MIDI_WRITE_BUFFER = 1 << 20  # midiutil writes many small chunks; batch them into one syscall
 
 # ===================== INSTRUMENT MAP =====================
 INSTRUMENTS = {
@@ -35,45 +36,77 @@ GENRES = {
     "Symphonic Pop / Modern Orchestra": {"tempo": 100, "instruments": ["Strings", "Piano", "Brass", "Percussion"]}
 }
 
+NOTE_DURATIONS = np.array([0.25, 0.5, 1.0])
+
 # ===================== FUNCTIONS =====================
+class _FilenameTable(dict):
+    """str.translate table: keeps alnum, space and _, maps anything else to "_"."""
+    def __missing__(self, code):
+        c = chr(code)
+        self[code] = c if c.isalnum() or c in " _" else "_"
+        return self[code]
+
+_FILENAME_TABLE = _FilenameTable()
+
+
 def generate_orchestra_midi(genre, duration_bars=16, beats_per_bar=4, bars_per_phrase=4):
     config = GENRES[genre]
     tempo = config["tempo"]
     instruments = config["instruments"]
 
+    # sample every (note, duration, velocity) for all tracks in one go
+    rng = np.random.default_rng()
+    shape = (len(instruments), duration_bars)
+    notes = rng.integers(60, 81, size=shape)
+    durations = rng.choice(NOTE_DURATIONS, size=shape)
+    velocities = rng.integers(60, 101, size=shape)
+    times = np.cumsum(durations, axis=1) - durations
+
     midi = MIDIFile(len(instruments))
     for i, section in enumerate(instruments):
         midi.addTrackName(i, 0, section)
         midi.addTempo(i, 0, tempo)
         midi.addProgramChange(i, i, 0, INSTRUMENTS[section])
 
-        time = 0
-        for bar in range(duration_bars):
-            note = random.randint(60, 80)
-            duration = random.choice([0.25, 0.5, 1])
-            velocity = random.randint(60, 100)
+        for note, time, duration, velocity in zip(notes[i].tolist(), times[i].tolist(),
+                                                  durations[i].tolist(), velocities[i].tolist()):
             midi.addNote(i, i, note, time, duration, velocity)
-            time += duration
 
     # 💥 FIX: Sanitize filename for Windows
-    safe_genre = "".join(c if c.isalnum() or c in (" ", "_") else "_" for c in genre)
+    safe_genre = genre.translate(_FILENAME_TABLE)
     filename = os.path.join(OUTPUT_DIR, f"orchestra_{safe_genre.replace(' ', '_')}.mid")
 
-    with open(filename, "wb") as f:
+    with open(filename, "wb", buffering=MIDI_WRITE_BUFFER) as f:
         midi.writeFile(f)
     print(f"✅ MIDI created: {filename}")
     return filename
 
 
+_mixer_inited = False
+
+
+def _init_mixer(pygame):
+    """Set up SDL audio once per process; it is torn down at exit."""
+    global _mixer_inited
+    if not _mixer_inited:
+        pygame.mixer.pre_init(frequency=44100, buffer=512)
+        pygame.display.init()  # event queue only (no window), for the end-of-music event
+        pygame.mixer.init()
+        atexit.register(pygame.quit)
+        _mixer_inited = True
+
+
 def play_midi_with_pygame(filepath):
-    pygame.init()
-    pygame.mixer.init()
+    import pygame  # loads SDL; only pay for it when playing
+    _init_mixer(pygame)
     print(f"\n🎧 Now playing: {filepath}\n")
     pygame.mixer.music.load(filepath)
+    # block in SDL until the mixer posts its end-of-music event
+    music_end = pygame.USEREVENT + 1
+    pygame.mixer.music.set_endevent(music_end)
     pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(10)
-    pygame.quit()
+    while pygame.event.wait().type != music_end:
+        pass
 
 
 def convert_to_audio(filepath, soundfont="example.sf2"):
@@ -84,12 +117,19 @@ def convert_to_audio(filepath, soundfont="example.sf2"):
         print("⚠️ Missing SoundFont (.sf2)! Download one like 'FluidR3_GM.sf2' and place it here.")
         return
 
-    subprocess.run(["fluidsynth", "-ni", soundfont, filepath, "-F", wav_path, "-r", "44100"])
-    print(f"🎼 Exported WAV: {wav_path}")
-
     if shutil.which("ffmpeg"):
-        subprocess.run(["ffmpeg", "-y", "-i", wav_path, mp3_path])
+        # pipe fluidsynth's raw PCM straight into ffmpeg, no intermediate WAV
+        fs = subprocess.Popen(["fluidsynth", "-ni", "-q", "-T", "raw", "-O", "s16", "-E", "little", "-r", "44100",
+                               "-F", "-", soundfont, filepath], stdout=subprocess.PIPE, bufsize=1 << 20)
+        ff = subprocess.Popen(["ffmpeg", "-y", "-f", "s16le", "-ar", "44100", "-ac", "2", "-i", "pipe:0", mp3_path],
+                              stdin=fs.stdout, bufsize=1 << 20)
+        fs.stdout.close()
+        ff.wait()
+        fs.wait()
         print(f"🎧 Exported MP3: {mp3_path}")
+    else:
+        subprocess.run(["fluidsynth", "-ni", soundfont, filepath, "-F", wav_path, "-r", "44100"])
+        print(f"🎼 Exported WAV: {wav_path}")
 
 
 # ===================== MAIN APP =====================
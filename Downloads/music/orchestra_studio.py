@@ -10,29 +10,41 @@ All-in-one lightweight orchestra studio:
 - JSON spec export describing what was composed
 """
 
-import os, sys, random, math, json, shutil, subprocess, time
+import os, sys, random, json, shutil, subprocess, time, functools, importlib.util, atexit
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from midiutil import MIDIFile
+from midiutil.MidiFile import MIDITrack, NoteOn, NoteOff
 
 # try optional modules
+# (pygame and tkinter are heavy; they are imported where they are used)
 try:
-    import pygame
+    from numba import njit
 except Exception:
-    pygame = None
+    def njit(*args, **kwargs):
+        # no numba: kernels run as plain Python
+        return args[0] if args and callable(args[0]) else (lambda f: f)
 try:
-    import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog
-    TK_AVAILABLE = True
+    import orjson
+    def dumps_spec(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
 except Exception:
-    TK_AVAILABLE = False
+    def dumps_spec(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+TK_AVAILABLE = importlib.util.find_spec("tkinter") is not None
 
 # -------------------------
 # Config / Instruments map
 # -------------------------
 OUTPUT_DIR = "orchestra_studio_output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+MIDI_WRITE_BUFFER = 1 << 20  # midiutil writes many small chunks; batch them into one syscall
+PIPE_BUFFER = 1 << 20  # fluidsynth -> ffmpeg pipe
 
 SOUNDFONT_CANDIDATES = ["FluidR3_GM.sf2", "GeneralUser_GS_SoftSynth_v1.44.sf2", "Orchestral.sf2", "example.sf2"]
+# lowercase name -> preference (lower wins); anything else ranks after all candidates
+SOUNDFONT_RANK = {cand.lower(): i for i, cand in enumerate(SOUNDFONT_CANDIDATES)}
 
 # General MIDI program numbers (a short useful subset)
 GM = {
@@ -72,7 +84,7 @@ DORIAN = [0,2,3,5,7,9,10]
 PENTATONIC = [0,2,4,7,9]
 
 def transpose_scale(root, mode):
-    return [root + step for step in mode]
+    return np.fromiter((root + step for step in mode), dtype=np.int16, count=len(mode))
 
 def build_chord_from_scale(scale, degree, kind="triad"):
     root = scale[degree % len(scale)]
@@ -131,46 +143,128 @@ ORCHESTRA_LAYOUT = [
     ("Synth/Texture", GM["pad_1_new_age"], 7)
 ]
 
+# per-track lookups, derived once from the layout
+TRACK_ROLES = ["lead" if "Violins" in n or "Piano" in n else ("bass" if "Bass" in n else "harmony")
+               for n, _, _ in ORCHESTRA_LAYOUT]
+SUSTAINED_TRACKS = {i for i, (n, _, _) in enumerate(ORCHESTRA_LAYOUT) if "Pad" in n or "Choir" in n}
+PERCUSSION_TRACK = next(i for i, (n, _, _) in enumerate(ORCHESTRA_LAYOUT) if "Percussion" in n)
+SECTION_INTENSITY = {"intro":0.4, "verse":0.7, "build":0.9, "drop":1.0, "outro":0.5}
+
+# -------------------------
+# MIDI writing
+# -------------------------
+class _JoinedTrack(MIDITrack):
+    # midiutil appends each serialized event with `MIDIdata += ...`, copying the whole
+    # track per event; one join keeps long pieces linear. Ticks are already relative
+    # here, so serialize(0) matches what midiutil passes.
+    def writeEventsToStream(self):
+        self.MIDIdata += b"".join(event.serialize(0) for event in self.MIDIEventList)
+
+class OrchestraMIDIFile(MIDIFile):
+    """MIDIFile whose tracks serialize in linear time; output is byte-identical."""
+    def __init__(self, numTracks=1, removeDuplicates=True, deinterleave=True, **kwargs):
+        super().__init__(numTracks, removeDuplicates, deinterleave, **kwargs)
+        self.tracks = [_JoinedTrack(removeDuplicates, deinterleave) for _ in self.tracks]
+
+    def addNotes(self, track, channel, pitches, times, durations, volumes):
+        """Same as calling addNote per note, with ticks converted in one vectorized pass."""
+        if self.header.numeric_format == 1:
+            track += 1
+        if not self.eventtime_is_ticks:
+            times = (np.asarray(times) * self.ticks_per_quarternote).astype(np.int64)
+            durations = (np.asarray(durations) * self.ticks_per_quarternote).astype(np.int64)
+        append = self.tracks[track].eventList.append
+        order = self.event_counter
+        for pitch, tick, dur, vol in zip(np.asarray(pitches).tolist(), np.asarray(times).tolist(),
+                                         np.asarray(durations).tolist(), np.asarray(volumes).tolist()):
+            append(NoteOn(channel, pitch, tick, dur, vol, insertion_order=order))
+            append(NoteOff(channel, pitch, tick + dur, vol, insertion_order=order))
+            order += 1
+        self.event_counter = order
+
+    def reset(self):
+        """Drop all events so the file (and its tracks) can be reused for a new piece."""
+        for track in self.tracks:
+            track.eventList.clear()
+            track.MIDIEventList.clear()
+            track.MIDIdata = b""
+            track.dataLength = 0
+            track.closed = False
+        self.event_counter = 0
+        self.closed = False
+
+# compose_full_piece borrows from here so batch runs don't rebuild the track objects per piece.
+# Keyed by the requested track count (format 1 files carry an extra tempo track in numTracks).
+_MIDI_POOL = {}
+
+def acquire_midi(num_tracks):
+    free = _MIDI_POOL.get(num_tracks)
+    if free:
+        return free.pop()
+    midi = OrchestraMIDIFile(num_tracks)
+    midi.pool_key = num_tracks
+    return midi
+
+def release_midi(midi):
+    midi.reset()
+    _MIDI_POOL.setdefault(midi.pool_key, []).append(midi)
+
 # -------------------------
 # Utility: sanitize filename
 # -------------------------
+class _FilenameTable(dict):
+    """str.translate table: keeps alnum, space, _ and -, maps anything else to "_"."""
+    def __missing__(self, code):
+        c = chr(code)
+        self[code] = c if c.isalnum() or c in " _-" else "_"
+        return self[code]
+
+_FILENAME_TABLE = _FilenameTable()
+
 def sanitize_filename(s):
-    safe = "".join(c if c.isalnum() or c in (" ", "_", "-") else "_" for c in s)
-    return "_".join(safe.split())
+    return "_".join(s.translate(_FILENAME_TABLE).split())
 
 # -------------------------
 # Humanization & dynamics
 # -------------------------
-def humanize_time(t, tightness):
-    return t + random.uniform(-tightness, tightness)
-
-def velocity_for_phase(phase, base, variance=20):
-    # phase 0..1 across a phrase
-    v = base + int(math.sin(math.pi * phase) * variance)
-    return clamp(v, 20, 127)
+_RNG = np.random.default_rng()
+_PHRASE_DURATIONS = np.array([0.5, 1.0, 0.25])
+_RESPONSE_SHIFTS = np.array([-12, 7, 0])
+
+@njit(cache=True)
+def _phrase_kernel(start_beat, scale_arr, role_offset, threshold, env, gate, picks, durs, jitter):
+    """Keeps the steps whose gate draw passed; returns (pitches, times, durs, vels) arrays."""
+    keep = np.nonzero(gate < threshold)[0]
+    pitches = scale_arr[picks[keep]].astype(np.int64) + role_offset
+    times = start_beat + keep * 0.5 + jitter[keep]  # step in 0.5 beat increments
+    return pitches, times, durs[keep], env[keep]
+
+def velocity_envelope(steps, base, variance=20):
+    # phase 0..1 across a phrase, one vectorized sin for the whole phrase
+    phase = np.arange(steps) / steps
+    return np.clip(base + (np.sin(np.pi * phase) * variance).astype(np.int64), 20, 127)
 
 # -------------------------
 # Song section generators
 # -------------------------
 def generate_phrase(midi, track_idx, channel, scale, start_beat, beats, personality, role="lead"):
     """Generates a phrase for a given instrument track."""
-    base = PERSONALITIES[personality]["velocity_base"]
-    tight = PERSONALITIES[personality]["tightness"]
-    complexity = PERSONALITIES[personality]["complexity"]
+    p = PERSONALITIES[personality]
+    tight = p["tightness"]
+    complexity = p["complexity"]
     chance_note = 0.9 if role=="lead" else 0.5
-    t = start_beat
-    placed = []
-    for i in range(int(beats*2)):  # step in 0.5 beat increments
-        if random.random() < chance_note * complexity:
-            pitch = random.choice(scale) + (0 if role!="bass" else -24)
-            dur = random.choice([0.5, 1.0, 0.25])
-            phase = (i / (beats*2))
-            vel = velocity_for_phase(phase, base, variance=int(20*complexity))
-            human_t = humanize_time(t, tight)
-            midi.addNote(track_idx, channel, int(pitch), human_t, dur, vel)
-            placed.append((int(pitch), human_t, dur, vel))
-        t += 0.5
-    return placed
+    role_offset = 0 if role!="bass" else -24
+    steps = int(beats*2)
+    env = velocity_envelope(steps, p["velocity_base"], variance=int(20*complexity))
+    # every random draw for the phrase in one batch per kind
+    gate = _RNG.random(steps)
+    picks = _RNG.integers(0, len(scale), steps)
+    durs = _RNG.choice(_PHRASE_DURATIONS, steps)
+    jitter = _RNG.uniform(-tight, tight, steps)
+    pitches, times, durs, vels = _phrase_kernel(float(start_beat), scale, role_offset, chance_note * complexity,
+                                                env, gate, picks, durs, jitter)
+    midi.addNotes(track_idx, channel, pitches, times, durs, vels)
+    return list(zip(pitches.tolist(), times.tolist(), durs.tolist(), vels.tolist()))
 
 # -------------------------
 # Core: compose full piece
@@ -182,11 +276,13 @@ def compose_full_piece(title, style, personality, bars=24, beats_per_bar=4, sect
     bpm = preset["bpm"]
     if PERSONALITIES.get(personality) is None:
         personality = "Default Composer"
+    # bound once: the section/track loops call these per track
+    rand, choice = random.random, random.choice
 
     scale = transpose_scale(root, mode)
     total_beats = bars * beats_per_bar
 
-    midi = MIDIFile(len(ORCHESTRA_LAYOUT))
+    midi = acquire_midi(len(ORCHESTRA_LAYOUT))
     for ti, (name, program, chan) in enumerate(ORCHESTRA_LAYOUT):
         midi.addTrackName(ti, 0, name)
         midi.addTempo(ti, 0, bpm)
@@ -216,31 +312,30 @@ def compose_full_piece(title, style, personality, bars=24, beats_per_bar=4, sect
         sec_beats = sec_bars * beats_per_bar
         meta_sec = {"name": sec_name, "bars": sec_bars, "start_beat": beat_cursor}
         # instrumentation intensity control
-        intensity = {"intro":0.4, "verse":0.7, "build":0.9, "drop":1.0, "outro":0.5}.get(sec_name, 0.7)
+        intensity = SECTION_INTENSITY.get(sec_name, 0.7)
 
         # for each instrument track, generate phrases
         for ti, (iname, program, chan) in enumerate(ORCHESTRA_LAYOUT):
-            role = "lead" if "Violins" in iname or "Piano" in iname else ("bass" if "Bass" in iname else "harmony")
+            role = TRACK_ROLES[ti]
             # reduce note density for lower intensity
-            if random.random() < (0.2 + (1.0-intensity)*0.7): 
+            if rand() < (0.2 + (1.0-intensity)*0.7): 
                 # sometimes skip to create dynamics
                 continue
 
             # multiplier for phrase length (longer for pads)
-            phrase_beats = sec_beats if "Pad" in iname or "Choir" in iname else min(sec_beats, 8)
+            phrase_beats = sec_beats if ti in SUSTAINED_TRACKS else min(sec_beats, 8)
             placed_notes = generate_phrase(midi, ti, chan, scale, beat_cursor, phrase_beats, personality, role=role)
             # pick a motif occasionally
-            if role=="lead" and random.random() < 0.6:
+            if role=="lead" and rand() < 0.6:
                 motifs.append((placed_notes, iname))
 
         # occasional modulation / tension
-        if sec_name in ("build", "drop") and random.random() < 0.4:
-            shift = random.choice([2, -1, 5, -3])
+        if sec_name in ("build", "drop") and rand() < 0.4:
+            shift = choice([2, -1, 5, -3])
             root += shift
             scale = transpose_scale(root, mode)
             # add timpani hit marker on percussion track
-            perct = next(i for i,(n,p,ch) in enumerate(ORCHESTRA_LAYOUT) if "Percussion" in n)
-            midi.addNote(perct, PERCUSSION_CHANNEL, 47, beat_cursor + 0.0, 1.0, 120)
+            midi.addNote(PERCUSSION_TRACK, PERCUSSION_CHANNEL, 47, beat_cursor + 0.0, 1.0, 120)
 
         meta_sec["intensity"] = intensity
         metadata["sections"].append(meta_sec)
@@ -248,25 +343,34 @@ def compose_full_piece(title, style, personality, bars=24, beats_per_bar=4, sect
 
     # call-and-response: take first motif create echo
     if motifs:
-        motif, instrument = random.choice(motifs)
-        # schedule response on another track a little later
-        for (p, s, d, v) in motif[:min(8, len(motif))]:
-            # pick a target track (woodwinds or brass)
-            target_t = 3 if random.random() < 0.6 else 4
-            resp_start = s + random.uniform(1.0, 2.0)
-            midi.addNote(target_t, ORCHESTRA_LAYOUT[target_t][2], int(p + random.choice([-12,7,0])), resp_start, d, clamp(v-8, 30, 110))
+        motif, instrument = choice(motifs)
+        # schedule response on another track a little later; columns are pitch, start, dur, vel
+        resp = np.array(motif[:8], dtype=np.float64).reshape(-1, 4)
+        k = len(resp)
+        # pick a target track per note (woodwinds or brass)
+        targets = np.where(_RNG.random(k) < 0.6, 3, 4)
+        starts = resp[:, 1] + _RNG.uniform(1.0, 2.0, size=k)
+        pitches = resp[:, 0].astype(np.int64) + _RNG.choice(_RESPONSE_SHIFTS, size=k)
+        vels = np.clip(resp[:, 3].astype(np.int64) - 8, 30, 110)
+        for target_t in (3, 4):
+            sel = targets == target_t
+            if sel.any():
+                midi.addNotes(target_t, ORCHESTRA_LAYOUT[target_t][2], pitches[sel], starts[sel], resp[sel, 2], vels[sel])
 
     # finalize file
     safe_title = sanitize_filename(title)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     midi_fname = os.path.join(OUTPUT_DIR, f"{safe_title}_{timestamp}.mid")
-    with open(midi_fname, "wb") as f:
-        midi.writeFile(f)
+    try:
+        with open(midi_fname, "wb", buffering=MIDI_WRITE_BUFFER) as f:
+            midi.writeFile(f)
+    finally:
+        release_midi(midi)
 
     # write JSON spec
     json_spec = os.path.join(OUTPUT_DIR, f"{safe_title}_{timestamp}.json")
-    with open(json_spec, "w", encoding="utf-8") as jf:
-        json.dump(metadata, jf, indent=2)
+    with open(json_spec, "wb") as jf:
+        jf.write(dumps_spec(metadata))
 
     return midi_fname, json_spec, bpm
 
@@ -274,16 +378,22 @@ def compose_full_piece(title, style, personality, bars=24, beats_per_bar=4, sect
 # Rendering helpers
 # -------------------------
 def find_soundfont():
-    cwd = os.getcwd()
-    for cand in SOUNDFONT_CANDIDATES:
-        path = os.path.join(cwd, cand)
-        if os.path.exists(path):
-            return path
-    # search any .sf2
-    for f in os.listdir(cwd):
-        if f.lower().endswith(".sf2"):
-            return os.path.join(cwd, f)
-    return None
+    return _scan_for_soundfont(os.getcwd())
+
+@functools.lru_cache(maxsize=8)
+def _scan_for_soundfont(folder):
+    # one pass over the folder: a known soundfont wins, otherwise any .sf2
+    fallback = len(SOUNDFONT_RANK)
+    best, best_rank = None, fallback
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            name = entry.name.lower()
+            if not name.endswith(".sf2") or not entry.is_file():
+                continue
+            r = SOUNDFONT_RANK.get(name, fallback)
+            if best is None or r < best_rank:
+                best, best_rank = entry.path, r
+    return best
 
 def render_mid_to_wav(sf, mid_path, wav_path):
     if not shutil.which("fluidsynth"):
@@ -302,25 +412,85 @@ def wav_to_mp3(wav_path, mp3_path):
     subprocess.run(cmd, check=True)
     return True
 
+def render_mid_to_mp3(sf, mid_path, mp3_path):
+    # fluidsynth's raw PCM goes straight into ffmpeg's stdin: no intermediate WAV on disk
+    if not shutil.which("fluidsynth"):
+        print("⚠ fluidsynth CLI not found. Skipping render to MP3. Install FluidSynth.")
+        return False
+    if not shutil.which("ffmpeg"):
+        print("⚠ ffmpeg not found; skipping MP3 conversion.")
+        return False
+    render = ["fluidsynth", "-ni", "-q", "-T", "raw", "-O", "s16", "-E", "little", "-r", "44100", "-F", "-", sf, mid_path]
+    encode = ["ffmpeg", "-y", "-f", "s16le", "-ar", "44100", "-ac", "2", "-i", "pipe:0", mp3_path]
+    print("render cmd:", " ".join(render), "|", " ".join(encode))
+    fs = subprocess.Popen(render, stdout=subprocess.PIPE, bufsize=PIPE_BUFFER)
+    ff = subprocess.Popen(encode, stdin=fs.stdout, bufsize=PIPE_BUFFER)
+    fs.stdout.close()  # ffmpeg owns the read end now
+    ff_rc, fs_rc = ff.wait(), fs.wait()
+    if fs_rc:
+        raise subprocess.CalledProcessError(fs_rc, render)
+    if ff_rc:
+        raise subprocess.CalledProcessError(ff_rc, encode)
+    return True
+
+def render_audio(sf, mid_path):
+    # MP3 straight from the pipe when ffmpeg is around, plain WAV otherwise
+    if shutil.which("ffmpeg"):
+        audio = mid_path.replace(".mid",".mp3")
+        ok = render_mid_to_mp3(sf, mid_path, audio)
+    else:
+        audio = mid_path.replace(".mid",".wav")
+        print("ffmpeg not found; rendering WAV to:", audio)
+        ok = render_mid_to_wav(sf, mid_path, audio)
+    return audio if ok else None
+
+def render_many(mid_paths, sf):
+    # fluidsynth renders on a single core, so run one process per file side by side
+    def render(mid_path):
+        try:
+            return render_audio(sf, mid_path)
+        except subprocess.CalledProcessError as e:
+            print("rendering error:", e)
+            return None
+    workers = max(1, min(len(mid_paths), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render, mid_paths))
+
 # -------------------------
 # Playback (wav) using pygame
 # -------------------------
+_mixer_inited = False
+
+def _init_mixer(pygame):
+    # SDL setup is slow, so do it once per process and tear down at exit. Only the
+    # event subsystem (display.init, no window) and the mixer are needed.
+    global _mixer_inited
+    if not _mixer_inited:
+        pygame.mixer.pre_init(frequency=44100, buffer=512)
+        pygame.display.init()
+        pygame.mixer.init()
+        atexit.register(pygame.quit)
+        _mixer_inited = True
+
 def play_audio_file(path):
-    if not pygame:
+    try:
+        import pygame
+    except Exception:
         print("pygame not installed; cannot auto-play audio.")
         return
-    pygame.init()
     try:
-        pygame.mixer.init()
-    except Exception:
-        pass
+        _init_mixer(pygame)
+    except Exception as e:
+        print("Audio device unavailable:", e)
+        return
     print("▶ Playing", path)
     pygame.mixer.music.load(path)
+    # block in SDL until the mixer posts its end-of-music event
+    music_end = pygame.USEREVENT + 1
+    pygame.mixer.music.set_endevent(music_end)
     pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(30)
-    pygame.mixer.quit()
-    pygame.quit()
+    while pygame.event.wait().type != music_end:
+        pass
 
 # -------------------------
 # CLI + optional GUI
@@ -358,9 +528,19 @@ def run_cli():
     except:
         bars = 24
 
-    midi_path, json_spec, bpm = compose_full_piece(title, style, ps, bars)
-    print("\nMIDI created at:", midi_path)
-    print("JSON spec at:", json_spec)
+    count = input("how many pieces? (default 1): ").strip() or "1"
+    try:
+        count = max(1, int(count))
+    except:
+        count = 1
+
+    titles = [title] if count == 1 else [f"{title}_{i}" for i in range(1, count+1)]
+    midi_paths = []
+    for t in titles:
+        midi_path, json_spec, bpm = compose_full_piece(t, style, ps, bars)
+        print("\nMIDI created at:", midi_path)
+        print("JSON spec at:", json_spec)
+        midi_paths.append(midi_path)
 
     sf = find_soundfont()
     if not sf:
@@ -369,24 +549,19 @@ def run_cli():
         if sf_input:
             sf = sf_input
     if sf:
-        wav = midi_path.replace(".mid",".wav")
-        print("Rendering WAV to:", wav)
-        try:
-            ok = render_mid_to_wav(sf, midi_path, wav)
-            if ok:
-                print("WAV rendered:", wav)
-                mp3 = midi_path.replace(".mid",".mp3")
-                wav_to_mp3(wav, mp3)
-                print("MP3:", mp3)
-                play_now = input("play the WAV now? (y/N): ").strip().lower()
-                if play_now == "y":
-                    play_audio_file(wav)
-        except subprocess.CalledProcessError as e:
-            print("rendering error:", e)
+        rendered = [a for a in render_many(midi_paths, sf) if a]
+        for audio in rendered:
+            print("Audio rendered:", audio)
+        if rendered:
+            play_now = input("play it now? (y/N): ").strip().lower()
+            if play_now == "y":
+                play_audio_file(rendered[0])
     print("\nDone. Check", OUTPUT_DIR, "for outputs.")
 
 def run_gui():
     # minimal GUI wrapper to pick options and run composer
+    import tkinter as tk
+    from tkinter import ttk, messagebox
     root = tk.Tk()
     root.title("Orchestra Studio")
     frm = ttk.Frame(root, padding=12)
@@ -420,8 +595,12 @@ def run_gui():
         midi_path, json_path, bpm = compose_full_piece(t, style_var.get(), per_var.get(), bars_var.get())
         status.set(f"MIDI created: {os.path.basename(midi_path)}")
         msg = f"Created MIDI: {midi_path}\nJSON: {json_path}\nOpen output folder?"
-        if messagebox.askyesno("Done", msg):
-            os.startfile(os.path.abspath(OUTPUT_DIR)) if sys.platform.startswith("win") else subprocess.run(["xdg-open", OUTPUT_DIR])
+        if messagebox.askyesno("Done", msg) and os.path.isdir(OUTPUT_DIR):
+            # don't wait on the file manager; this runs on the Tk thread
+            if sys.platform.startswith("win"):
+                os.startfile(os.path.abspath(OUTPUT_DIR))
+            else:
+                subprocess.Popen(["xdg-open", OUTPUT_DIR], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         status.set("Ready")
 
     ttk.Button(frm, text="Compose", command=on_compose).grid(column=0, row=5, pady=8)
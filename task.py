@@ -13,12 +13,16 @@ Run with: python todozen_local_dark_rewritten.py
 
 import os
 import json
+import heapq
+import bisect
+import itertools
+import queue
 import threading
-import time
 import traceback
 from datetime import datetime, timedelta, date
+from enum import IntEnum
 from uuid import uuid4
-from functools import partial
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
 # UI & extras
@@ -32,18 +36,59 @@ except Exception:
 
 # Optional pymongo
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, ReplaceOne, DeleteMany
+    from pymongo.errors import ServerSelectionTimeoutError
 except Exception:
     MongoClient = None
 
+# Optional orjson (C JSON codec); stdlib json otherwise. Both produce/accept UTF-8 bytes.
+try:
+    import orjson
+
+    def json_dumps(obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    json_loads = orjson.loads
+except Exception:
+    def json_dumps(obj: Any, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+    json_loads = json.loads
+
 # -----------------------
 # Configuration
 # -----------------------
 FILE_NAME = "tasks.json"
-NOTIFY_CHECK_INTERVAL = 8   # seconds between notification checks
+JOURNAL_NAME = "tasks.journal.jsonl"  # per-change log on top of FILE_NAME, compacted on full save
+FLUSH_DELAY_MS = 250  # coalesce edits before writing them out
+PERSIST_DELAY_MS = 200  # coalesce full saves (Save button bursts)
+FSYNC_EVERY = 20  # JSON writes between fsyncs; close always syncs
+NOTIFY_MIN_SLEEP = 0.5     # seconds; floor for the notifier's adaptive wait
+NOTIFY_IDLE_SLEEP = 300    # seconds to wait when nothing is coming due
 NOTIFY_LOOKAHEAD_MIN = 0    # minutes ahead to trigger (0 = at due time)
 SNOOZE_OPTIONS = [5, 10, 15, 30, 60]
+HOURS_24 = tuple(f"{h:02d}" for h in range(24))          # time picker choices
+MINS_5 = tuple(f"{m:02d}" for m in range(0, 60, 5))
 DEFAULT_LOCAL_MONGO_URI = "mongodb://localhost:27017/todozen"
+CARD_ROW_HEIGHT = 82        # approx. height of one task card incl. padding (unscaled px)
+RENDER_OVERSCAN = 10        # cards kept alive above/below the viewport
+PULSE_ADD_BUTTON = False    # idle "breathing" Add button; resizes it (and relayouts) every 2s
+
+# Recurrence is stored as an int; older files hold the lowercase name
+class Recurrence(IntEnum):
+    NONE = 0
+    DAILY = 1
+    WEEKLY = 2
+    MONTHLY = 3
+
+
+RECUR_DELTA = {
+    Recurrence.DAILY: timedelta(days=1),
+    Recurrence.WEEKLY: timedelta(weeks=1),
+    Recurrence.MONTHLY: timedelta(days=30),  # naive
+}
+RECUR_LABEL = {r: r.name.capitalize() for r in Recurrence}   # "None", "Daily", ...
+RECUR_BY_LABEL = {label: r for r, label in RECUR_LABEL.items()}
 
 # -----------------------
 # Utilities
@@ -54,14 +99,41 @@ def now_local() -> datetime:
 
 
 def parse_iso(s: Optional[str]) -> Optional[datetime]:
-    if not s:
+    if not s or not isinstance(s, str):
         return None
+    return _parse_iso_cached(s)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_cached(s: str) -> Optional[datetime]:
+    # datetimes are immutable, so cached results can be shared
     try:
         return datetime.fromisoformat(s)
-    except Exception:
+    except ValueError:
         return None
 
 
+def to_recurrence(value: Any) -> Recurrence:
+    # accepts the stored int or a legacy name ("daily"); unknown values mean no recurrence
+    if isinstance(value, str):
+        return Recurrence.__members__.get(value.upper(), Recurrence.NONE)
+    try:
+        return Recurrence(value)
+    except (ValueError, TypeError):
+        return Recurrence.NONE
+
+
+def set_due(t: Dict[str, Any], dt: Optional[datetime]) -> None:
+    # keep the parsed due time next to the ISO string so hot paths never re-parse it
+    t["due"] = dt.isoformat() if dt else None
+    t["_due_dt"] = dt
+
+
+def stored_fields(t: Dict[str, Any]) -> Dict[str, Any]:
+    # underscore keys (Mongo's _id, cached _due_dt) are never written out
+    return {k: v for k, v in t.items() if not k.startswith("_")}
+
+
 def combine_date_time(d: date, hour: int, minute: int) -> Optional[datetime]:
     try:
         return datetime(d.year, d.month, d.day, hour, minute, 0)
@@ -77,14 +149,17 @@ class Storage:
         self.use_mongo = False
         self.client = None
         self.collection = None
+        self._mongo_verified = False
+        self._writes_since_sync = 0
 
         env_uri = os.getenv("MONGO_URI")
         uri_to_try = env_uri or uri or DEFAULT_LOCAL_MONGO_URI
 
         if uri_to_try and MongoClient is not None:
             try:
+                # no probe here: the client connects lazily, and the first real
+                # operation (see _mongo_call) tells us whether the server is there
                 self.client = MongoClient(uri_to_try, serverSelectionTimeoutMS=3000)
-                self.client.server_info()
                 db = self.client.get_database() if self.client is not None else self.client["todozen"]
                 self.collection = db["todozen_tasks"]
                 self.use_mongo = True
@@ -94,48 +169,137 @@ class Storage:
                 self.use_mongo = False
 
         if not self.use_mongo:
-            # ensure local file exists
-            if not os.path.exists(FILE_NAME):
-                with open(FILE_NAME, "w", encoding="utf-8") as f:
-                    json.dump([], f)
+            self._init_json()
+
+    def _init_json(self) -> None:
+        # ensure local file exists
+        if not os.path.exists(FILE_NAME):
+            with open(FILE_NAME, "wb") as f:
+                f.write(json_dumps([]))
+
+    def _mongo_call(self, fn, *args, **kwargs) -> Any:
+        # If the server can't be reached on the first operation, switch to JSON for
+        # the session and return None (callers check use_mongo). Later failures raise.
+        try:
+            result = fn(*args, **kwargs)
+        except ServerSelectionTimeoutError as e:
+            if self._mongo_verified:
+                raise
+            print("MongoDB connection failed (using local JSON). Error:", e)
+            self.use_mongo = False
+            self._init_json()
+            return None
+        if not self._mongo_verified:
+            self._mongo_verified = True
+            self._ensure_id_index()
+        return result
+
+    def _ensure_id_index(self) -> None:
+        # every upsert/delete filters on "id"; without an index each one scans the
+        # collection. Idempotent, so it's fine to run once per session.
+        try:
+            self.collection.create_index([("id", 1)], unique=True, name="id_unique")
+        except Exception as e:
+            print("MongoDB: could not create index on id:", e)
 
     def load(self) -> List[Dict[str, Any]]:
         if self.use_mongo and self.collection is not None:
-            docs = list(self.collection.find({}))
+            docs = self._mongo_call(lambda: list(self.collection.find({})))
+            if self.use_mongo:
+                tasks = []
+                for d in docs:
+                    t = dict(d)
+                    _id = t.pop("_id", None)
+                    t["id"] = str(_id) if _id else t.get("id", str(uuid4()))
+                    tasks.append(t)
+                return tasks
+        try:
+            with open(FILE_NAME, "rb") as f:
+                tasks = json_loads(f.read())
+        except Exception:
             tasks = []
-            for d in docs:
-                t = dict(d)
-                _id = t.pop("_id", None)
-                t["id"] = str(_id) if _id else t.get("id", str(uuid4()))
-                tasks.append(t)
+        return self._replay_journal(tasks)
+
+    @staticmethod
+    def _replay_journal(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not os.path.exists(JOURNAL_NAME):
             return tasks
-        else:
-            try:
-                with open(FILE_NAME, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                return []
+        by_id = {t.get("id"): t for t in tasks}
+        with open(JOURNAL_NAME, "rb") as f:
+            for line in f:
+                try:
+                    rec = json_loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if rec.get("op") == "put":
+                    by_id[rec["task"].get("id")] = rec["task"]
+                elif rec.get("op") == "del":
+                    by_id.pop(rec.get("id"), None)
+        return list(by_id.values())
+
+    @staticmethod
+    def _upsert(t: Dict[str, Any]) -> "ReplaceOne":
+        return ReplaceOne({"id": t.get("id")}, stored_fields(t), upsert=True)
 
     def save(self, tasks: List[Dict[str, Any]]) -> None:
         if self.use_mongo and self.collection is not None:
+            # upserts and the deletion sync go to the server as one unordered batch
+            requests = []
+            local_ids = []
             for t in tasks:
-                cond = {"id": t.get("id")}
-                t_clean = dict(t)
-                t_clean.pop("_id", None)
-                self.collection.replace_one(cond, t_clean, upsert=True)
-            # sync deletion
-            try:
-                remote = list(self.collection.find({}, {"id": 1}))
-                remote_ids = {str(r.get("id")) for r in remote if r.get("id")}
-                local_ids = {t.get("id") for t in tasks if t.get("id")}
-                to_delete = list(remote_ids - local_ids)
-                if to_delete:
-                    self.collection.delete_many({"id": {"$in": to_delete}})
-            except Exception:
-                pass
-        else:
-            with open(FILE_NAME, "w", encoding="utf-8") as f:
-                json.dump(tasks, f, indent=2, ensure_ascii=False)
+                requests.append(self._upsert(t))
+                if t.get("id"):
+                    local_ids.append(t["id"])
+            # None/"" in $nin keeps documents that never had an id, as before
+            requests.append(DeleteMany({"id": {"$nin": local_ids + [None, ""]}}))
+            self._mongo_call(self.collection.bulk_write, requests, ordered=False)
+            if self.use_mongo:
+                return
+        # write-then-rename: a crash leaves either the old file or the new one, never a truncated one
+        tmp = FILE_NAME + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json_dumps([stored_fields(t) for t in tasks], indent=True))
+            self._maybe_fsync(f)
+        os.replace(tmp, FILE_NAME)
+        # everything in the journal is now in FILE_NAME
+        if os.path.exists(JOURNAL_NAME):
+            os.remove(JOURNAL_NAME)
+
+    def save_delta(self, dirty_tasks: List[Dict[str, Any]], deleted_ids: List[str]) -> None:
+        """Persist only the tasks changed or deleted since the last flush."""
+        if self.use_mongo and self.collection is not None:
+            requests = [self._upsert(t) for t in dirty_tasks]
+            if deleted_ids:
+                requests.append(DeleteMany({"id": {"$in": list(deleted_ids)}}))
+            if not requests:
+                return
+            self._mongo_call(self.collection.bulk_write, requests, ordered=False)
+            if self.use_mongo:
+                return
+        with open(JOURNAL_NAME, "ab") as f:
+            for t in dirty_tasks:
+                f.write(json_dumps({"op": "put", "task": stored_fields(t)}) + b"\n")
+            for tid in deleted_ids:
+                f.write(json_dumps({"op": "del", "id": tid}) + b"\n")
+            self._maybe_fsync(f)
+
+    def _maybe_fsync(self, f) -> None:
+        # durability is only forced every FSYNC_EVERY writes (and by fsync_now)
+        self._writes_since_sync += 1
+        if self._writes_since_sync >= FSYNC_EVERY:
+            f.flush()
+            os.fsync(f.fileno())
+            self._writes_since_sync = 0
+
+    def fsync_now(self) -> None:
+        """Flush the JSON store to disk; call before exiting."""
+        if self.use_mongo:
+            return
+        for path in (FILE_NAME, JOURNAL_NAME):
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    os.fsync(f.fileno())
+        self._writes_since_sync = 0
 
 
 # -----------------------
@@ -150,6 +314,9 @@ class ToDoZen(ctk.CTk):
         super().__init__()
         self.storage = storage
         self.tasks = self.storage.load()
+        for t in self.tasks:
+            t["_due_dt"] = parse_iso(t.get("due"))
+            t["recurrence"] = to_recurrence(t.get("recurrence"))
         self.title("🪷 ToDoZen — Local Dark Mode")
         self.geometry("920x660")
         self.minsize(760, 520)
@@ -163,9 +330,40 @@ class ToDoZen(ctk.CTk):
         }
         self.current_mood = "Dark"
 
-        # lifecycle controls
-        self._stop_event = threading.Event()
-        self._notifier_thread: Optional[threading.Thread] = None
+        # reminders: one Tk timer aimed at the earliest pending due time
+        self._notify_job: Optional[str] = None
+
+        # incremental persistence: ids touched since the last flush
+        self._dirty_ids: set = set()
+        self._deleted_ids: set = set()
+        self._flush_job: Optional[str] = None
+        self._persist_job: Optional[str] = None
+        # storage writes are queued to a single writer thread, off the Tk thread
+        self._writer_q: "queue.Queue" = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+        # due-time indexes, kept current by _index_task/_unindex_task:
+        #   _sorted_keys: (due, seq, id) in display order, so rendering never re-sorts
+        #   _due_heap: (due, id) of tasks that may still notify; stale entries are
+        #   skipped when they reach the top instead of being removed eagerly
+        self._task_by_id: Dict[str, Dict[str, Any]] = {}
+        self._sort_keys: Dict[str, tuple] = {}
+        self._sorted_keys: List[tuple] = []
+        self._due_heap: List[tuple] = []
+        self._index_seq = itertools.count()
+        for t in sorted(self.tasks, key=lambda t: t.get("_due_dt") or datetime.max):
+            self._index_task(t)
+
+        # rendered task cards by id (only the slice around the viewport), the id
+        # order they are packed in, and unpacked cards waiting to be reused
+        self._cards: Dict[str, Dict[str, Any]] = {}
+        self._card_order: List[str] = []
+        self._free_cards: List[Dict[str, Any]] = []
+        self._window = (0, 0)
+        self._known_ids: Optional[set] = None
+        self._rewindow_job: Optional[str] = None
+        self._empty_label = None
 
         # build UI
         self._build_ui()
@@ -173,10 +371,11 @@ class ToDoZen(ctk.CTk):
         self.render_tasks()
 
         # start notifier
-        self._start_notifier()
+        self._schedule_notifier()
 
         # pulse animation
-        self.after(700, self._pulse_add_button)
+        if PULSE_ADD_BUTTON:
+            self.after(700, self._pulse_add_button)
 
     # ---------------- UI ----------------
     def _build_ui(self) -> None:
@@ -210,21 +409,17 @@ class ToDoZen(ctk.CTk):
         self.date_entry = DateEntry(add_frame, width=12)
         self.date_entry.grid(row=0, column=2, padx=6)
 
-        hours = [f"{h:02d}" for h in range(24)]
-        mins = [f"{m:02d}" for m in range(0, 60, 5)]
-
-        self.hour_var = ctk.StringVar(value=f"{now_local().hour:02d}")
-        self.hour_menu = ctk.CTkOptionMenu(add_frame, values=hours, variable=self.hour_var, width=70)
+        now = now_local()  # one reading, so hour and minute can't straddle a boundary
+        self.hour_var = ctk.StringVar(value=f"{now.hour:02d}")
+        self.hour_menu = ctk.CTkOptionMenu(add_frame, values=HOURS_24, variable=self.hour_var, width=70)
         self.hour_menu.grid(row=0, column=3, padx=4)
 
-        self.min_var = ctk.StringVar(value=f"{now_local().minute:02d}")
-        if int(self.min_var.get()) % 5 != 0:
-            self.min_var.set(f"{(int(self.min_var.get()) // 5) * 5:02d}")
-        self.min_menu = ctk.CTkOptionMenu(add_frame, values=mins, variable=self.min_var, width=70)
+        self.min_var = ctk.StringVar(value=f"{(now.minute // 5) * 5:02d}")
+        self.min_menu = ctk.CTkOptionMenu(add_frame, values=MINS_5, variable=self.min_var, width=70)
         self.min_menu.grid(row=0, column=4, padx=4)
 
         self.recur_var = ctk.StringVar(value="None")
-        recur_menu = ctk.CTkOptionMenu(add_frame, values=["None", "Daily", "Weekly", "Monthly"], variable=self.recur_var, width=110)
+        recur_menu = ctk.CTkOptionMenu(add_frame, values=list(RECUR_LABEL.values()), variable=self.recur_var, width=110)
         recur_menu.grid(row=0, column=5, padx=6)
 
         self.add_button = ctk.CTkButton(add_frame, text="➕ Add", width=110, command=self.add_task)
@@ -232,6 +427,20 @@ class ToDoZen(ctk.CTk):
 
         self.tasks_frame = ctk.CTkScrollableFrame(self, label_text="Your Tasks", width=880, height=420, corner_radius=10)
         self.tasks_frame.pack(padx=12, pady=6)
+        # CTkScrollableFrame has no scroll callback; wrap its canvas's yscrollcommand
+        # (which feeds the scrollbar) so scrolling/resizing can re-window the list
+        canvas, scrollbar = self.tasks_frame._parent_canvas, self.tasks_frame._scrollbar
+
+        def on_yscroll(first: str, last: str) -> None:
+            scrollbar.set(first, last)
+            self._on_list_scroll()
+
+        canvas.configure(yscrollcommand=on_yscroll)
+        # stand-ins for the rows above and below the rendered slice
+        self._top_spacer = ctk.CTkFrame(self.tasks_frame, height=1, fg_color="transparent")
+        self._top_spacer.pack(fill="x")
+        self._bottom_spacer = ctk.CTkFrame(self.tasks_frame, height=1, fg_color="transparent")
+        self._bottom_spacer.pack(fill="x")
 
         footer = ctk.CTkFrame(self, corner_radius=10)
         footer.pack(fill="x", padx=12, pady=(6, 12))
@@ -261,138 +470,356 @@ class ToDoZen(ctk.CTk):
             "id": str(uuid4()),
             "task": text,
             "category": self.category_var.get(),
-            "due": due_dt.isoformat(),
             "done": False,
             "created": datetime.utcnow().isoformat(),
-            "recurrence": self.recur_var.get().lower(),
+            "recurrence": RECUR_BY_LABEL.get(self.recur_var.get(), Recurrence.NONE),
             "notified": False,
         }
+        set_due(task, due_dt)
         self.tasks.append(task)
-        self._persist()
+        self._index_task(task)
+        self._mark_dirty(task["id"])
         self.task_entry.delete(0, "end")
         self.render_tasks()
         self._toast(f"Added: {text}")
 
     def toggle_done(self, task_id: str) -> None:
-        for t in self.tasks:
-            if t.get("id") == task_id:
-                t["done"] = not t.get("done", False)
-                if t["done"] and t.get("recurrence", "none") != "none":
-                    self._schedule_next_for_recurring(t)
-                if not t["done"]:
-                    t["notified"] = False
-                break
-        self._persist()
+        t = self._task_by_id.get(task_id)
+        if t is not None:
+            t["done"] = not t.get("done", False)
+            if t["done"] and t.get("recurrence"):
+                self._schedule_next_for_recurring(t)
+            if not t["done"]:
+                t["notified"] = False
+                self._index_task(t)
+            self._mark_dirty(task_id)
         self.render_tasks()
 
     def delete_task(self, task_id: str) -> None:
-        self.tasks = [t for t in self.tasks if t.get("id") != task_id]
-        self._persist()
+        # _task_by_id is the canonical store; render_tasks rebuilds self.tasks from it
+        self._unindex_task(task_id)
+        self._mark_deleted(task_id)
         self.render_tasks()
 
     def snooze_task(self, task_id: str, minutes: int) -> None:
-        for t in self.tasks:
-            if t.get("id") == task_id:
-                due = parse_iso(t.get("due"))
-                if due:
-                    new_due = due + timedelta(minutes=minutes)
-                    t["due"] = new_due.isoformat()
-                    t["notified"] = False
-                    self._persist()
-                    self.render_tasks()
-                    self._toast(f"Snoozed {t['task']} by {minutes} min")
-                break
+        t = self._task_by_id.get(task_id)
+        due = t.get("_due_dt") if t else None
+        if due:
+            set_due(t, due + timedelta(minutes=minutes))
+            t["notified"] = False
+            self._index_task(t)
+            self._mark_dirty(task_id)
+            self.render_tasks()
+            self._toast(f"Snoozed {t['task']} by {minutes} min")
 
     def edit_task_due(self, task_id: str, new_dt: datetime) -> None:
-        for t in self.tasks:
-            if t.get("id") == task_id:
-                t["due"] = new_dt.isoformat()
-                t["notified"] = False
-                self._persist()
-                self.render_tasks()
-                break
+        t = self._task_by_id.get(task_id)
+        if t is not None:
+            set_due(t, new_dt)
+            t["notified"] = False
+            self._index_task(t)
+            self._mark_dirty(task_id)
+            self.render_tasks()
 
     def _schedule_next_for_recurring(self, task: Dict[str, Any]) -> None:
-        rec = task.get("recurrence", "none")
-        if rec == "none":
-            return
-        due = parse_iso(task.get("due"))
-        if not due:
-            return
-        if rec == "daily":
-            next_due = due + timedelta(days=1)
-        elif rec == "weekly":
-            next_due = due + timedelta(weeks=1)
-        elif rec == "monthly":
-            next_due = due + timedelta(days=30)  # naive
-        else:
+        delta = RECUR_DELTA.get(task.get("recurrence"))
+        due = task.get("_due_dt")
+        if not delta or not due:
             return
+        next_due = due + delta
         new_task = dict(task)
         new_task["id"] = str(uuid4())
-        new_task["due"] = next_due.isoformat()
+        set_due(new_task, next_due)
         new_task["done"] = False
         new_task["notified"] = False
         self.tasks.append(new_task)
+        self._index_task(new_task)
+        self._mark_dirty(new_task["id"])
+
+    def _index_task(self, t: Dict[str, Any]) -> None:
+        # call after a task is added or its due/done/notified state changes
+        tid = t["id"]
+        due = t.get("_due_dt")
+        self._task_by_id[tid] = t
+        old = self._sort_keys.get(tid)
+        if old is None or old[0] != (due or datetime.max):
+            if old is not None:
+                del self._sorted_keys[bisect.bisect_left(self._sorted_keys, old)]
+            key = (due or datetime.max, next(self._index_seq), tid)
+            bisect.insort(self._sorted_keys, key)
+            self._sort_keys[tid] = key
+        if due and not t.get("done") and not t.get("notified"):
+            heapq.heappush(self._due_heap, (due, tid))
+
+    def _unindex_task(self, task_id: str) -> None:
+        self._task_by_id.pop(task_id, None)
+        old = self._sort_keys.pop(task_id, None)
+        if old is not None:
+            del self._sorted_keys[bisect.bisect_left(self._sorted_keys, old)]
+
+    def _heap_entry_live(self, due: datetime, tid: str) -> Optional[Dict[str, Any]]:
+        # the task a heap entry refers to, if the entry still matches its state
+        t = self._task_by_id.get(tid)
+        if t and not t.get("done") and not t.get("notified") and t.get("_due_dt") == due:
+            return t
+        return None
+
+    def _peek_due(self, not_before: datetime) -> Optional[datetime]:
+        # earliest due time that may still notify; drops stale entries and ones
+        # older than not_before (their notify window has passed)
+        heap = self._due_heap
+        while heap:
+            due, tid = heap[0]
+            if due >= not_before and self._heap_entry_live(due, tid):
+                return due
+            heapq.heappop(heap)
+        return None
+
+    def _pop_due(self, now: datetime) -> List[Dict[str, Any]]:
+        # tasks that have entered the notify window, taken off the heap; entries whose
+        # window already passed are dropped (they never fired before either)
+        window_start = now - timedelta(minutes=1)
+        window_end = now + timedelta(minutes=NOTIFY_LOOKAHEAD_MIN)
+        firing: Dict[str, Dict[str, Any]] = {}
+        heap = self._due_heap
+        while heap and heap[0][0] <= window_end:
+            due, tid = heapq.heappop(heap)
+            t = self._heap_entry_live(due, tid)
+            if t and due >= window_start:
+                firing[tid] = t
+        return list(firing.values())
+
+    def _mark_dirty(self, task_id: str) -> None:
+        self._deleted_ids.discard(task_id)
+        self._dirty_ids.add(task_id)
+        self._schedule_flush()
+        self._schedule_notifier()
+
+    def _mark_deleted(self, task_id: str) -> None:
+        self._dirty_ids.discard(task_id)
+        self._deleted_ids.add(task_id)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_job is None:
+            self._flush_job = self.after(FLUSH_DELAY_MS, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_job = None
+        if not self._dirty_ids and not self._deleted_ids:
+            return
+        dirty = [dict(self._task_by_id[tid]) for tid in self._dirty_ids if tid in self._task_by_id]
+        deleted = list(self._deleted_ids)
+        self._dirty_ids.clear()
+        self._deleted_ids.clear()
+        self._writer_q.put(("delta", (dirty, deleted)))
 
     def _persist(self) -> None:
+        # debounced full save: a burst of calls produces one write
+        if self._persist_job is not None:
+            self.after_cancel(self._persist_job)
+        self._persist_job = self.after(PERSIST_DELAY_MS, self._do_persist)
+
+    def _do_persist(self) -> None:
+        self._persist_job = None
+        self._drop_pending_delta()
+        snapshot = [dict(t) for t in list(self._task_by_id.values())]
+        self._writer_q.put(("full", snapshot))
+
+    def _persist_now(self) -> None:
+        # synchronous full save for shutdown; waits for queued writes first
+        if self._persist_job is not None:
+            self.after_cancel(self._persist_job)
+            self._persist_job = None
+        self._drop_pending_delta()
+        self._writer_q.put(None)
+        self._writer_thread.join()
+        self._run_storage(self.storage.save, list(self._task_by_id.values()))
+        self._run_storage(self.storage.fsync_now)
+
+    def _drop_pending_delta(self) -> None:
+        # a full save covers any pending delta
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
+        self._dirty_ids.clear()
+        self._deleted_ids.clear()
+
+    def _writer_loop(self) -> None:
+        # drain everything queued and write it as at most one full save plus one
+        # merged delta: a newer full snapshot supersedes all earlier jobs
+        stop = False
+        while not stop:
+            batch = [self._writer_q.get()]
+            while True:
+                try:
+                    batch.append(self._writer_q.get_nowait())
+                except queue.Empty:
+                    break
+            full, dirty, deleted = None, {}, set()
+            for job in batch:
+                if job is None:
+                    stop = True
+                    continue
+                kind, payload = job
+                if kind == "full":
+                    full, dirty, deleted = payload, {}, set()
+                    continue
+                changed, removed = payload
+                for t in changed:
+                    dirty[t.get("id")] = t
+                    deleted.discard(t.get("id"))
+                for tid in removed:
+                    dirty.pop(tid, None)
+                    deleted.add(tid)
+            if full is not None:
+                self._run_storage(self.storage.save, full)
+            if dirty or deleted:
+                self._run_storage(self.storage.save_delta, list(dirty.values()), list(deleted))
+
+    @staticmethod
+    def _run_storage(fn, *args) -> None:
         try:
-            self.storage.save(self.tasks)
+            fn(*args)
         except Exception as e:
             print("Persist error:", e)
             traceback.print_exc()
 
     # ---------------- UI Rendering ----------------
     def render_tasks(self) -> None:
-        for w in self.tasks_frame.winfo_children():
-            w.destroy()
-
-        def due_key(t: Dict[str, Any]):
-            d = parse_iso(t.get("due"))
-            return d or datetime.max
-
-        self.tasks.sort(key=due_key)
+        # Virtualized: only tasks around the viewport get cards, and spacers stand in
+        # for the rest. Cards leaving the slice are recycled for tasks entering it.
+        # Within the slice only added/changed cards touch Tk, and cards are
+        # re-packed only when their relative order changes.
+        order = [key[2] for key in self._sorted_keys]
+        self.tasks = [self._task_by_id[tid] for tid in order]
+        start, end = self._window = self._visible_range(len(order))
+        new_order = order[start:end]
+        live = set(new_order)
+
+        for tid in [tid for tid in self._cards if tid not in live]:
+            card = self._cards.pop(tid)
+            card["frame"].pack_forget()
+            self._free_cards.append(card)
 
         if not self.tasks:
-            ctk.CTkLabel(self.tasks_frame, text="No tasks yet. Create your rhythm ✨").pack(pady=12)
+            if self._empty_label is None:
+                self._empty_label = ctk.CTkLabel(self.tasks_frame, text="No tasks yet. Create your rhythm ✨")
+            self._empty_label.pack(pady=12)
+        elif self._empty_label is not None:
+            self._empty_label.pack_forget()
+
+        for t in self.tasks[start:end]:
+            card = self._cards.get(t.get("id"))
+            if card is None:
+                card = self._free_cards.pop() if self._free_cards else self._render_task_card(t)
+                self._cards[t.get("id")] = card
+            self._update_task_card(card, t)
+
+        # pack cards that entered the slice around the ones that stayed, if the
+        # survivors are still contiguous and in order; otherwise re-pack the slice
+        kept = [tid for tid in self._card_order if tid in live]
+        i = new_order.index(kept[0]) if kept else 0
+        if new_order[i:i + len(kept)] == kept:
+            anchor = self._cards[kept[0]]["frame"] if kept else self._bottom_spacer
+            for tid in new_order[:i]:
+                self._cards[tid]["frame"].pack(fill="x", padx=8, pady=6, before=anchor)
+            for tid in new_order[i + len(kept):]:
+                self._cards[tid]["frame"].pack(fill="x", padx=8, pady=6, before=self._bottom_spacer)
         else:
-            for t in self.tasks:
-                self._render_task_card(t)
+            for tid in kept:
+                self._cards[tid]["frame"].pack_forget()
+            for tid in new_order:
+                self._cards[tid]["frame"].pack(fill="x", padx=8, pady=6, before=self._bottom_spacer)
+        self._card_order = new_order
+        self._top_spacer.configure(height=max(1, start * CARD_ROW_HEIGHT))
+        self._bottom_spacer.configure(height=max(1, (len(order) - end) * CARD_ROW_HEIGHT))
+
+        # flash tasks that are new since the last render (not on the initial fill)
+        if self._known_ids is not None:
+            fresh = [self._cards[tid]["frame"] for tid in new_order if tid not in self._known_ids]
+            if fresh:
+                self._animate_widget_in(fresh)
+        self._known_ids = set(order)
 
         pending = sum(1 for t in self.tasks if not t.get("done", False))
         self.count_label.configure(text=f" • {pending} pending")
 
-    def _render_task_card(self, t: Dict[str, Any]) -> None:
-        frame = ctk.CTkFrame(self.tasks_frame, corner_radius=10)
-        frame.pack(fill="x", padx=8, pady=6)
-
-        left = ctk.CTkFrame(frame, fg_color="transparent")
-        left.pack(side="left", fill="x", expand=True, padx=6, pady=6)
-
+    @staticmethod
+    def _card_texts(t: Dict[str, Any]):
         title = t.get("task", "")
         if t.get("done"):
             title = "✅ " + title
-        ctk.CTkLabel(left, text=title, anchor="w", font=("Helvetica", 13, "bold")).pack(fill="x")
-        due_dt = parse_iso(t.get("due"))
+        due_dt = t.get("_due_dt")
         due_str = due_dt.strftime("%Y-%m-%d %H:%M") if due_dt else "No due"
-        meta = f"{t.get('category','General')} • Due: {due_str} • {t.get('recurrence','none').capitalize()}"
-        ctk.CTkLabel(left, text=meta, anchor="w", font=("Helvetica", 10)).pack(fill="x", pady=(2, 0))
-
-        right = ctk.CTkFrame(frame, fg_color="transparent")
-        right.pack(side="right", padx=6, pady=6)
-
+        meta = f"{t.get('category','General')} • Due: {due_str} • {RECUR_LABEL[t.get('recurrence', Recurrence.NONE)]}"
         done_txt = "↩ Undo" if t.get("done") else "✅ Done"
-        ctk.CTkButton(right, text=done_txt, width=90, command=partial(self.toggle_done, t.get("id"))).pack(side="right", padx=4)
-        ctk.CTkButton(right, text="✎", width=42, command=partial(self._open_edit_dialog, t.get("id"))).pack(side="right", padx=4)
-        ctk.CTkButton(right, text="🗑", width=42, fg_color="#ff6b6b", hover_color="#ff8080", command=partial(self.delete_task, t.get("id"))).pack(side="right", padx=4)
+        return title, meta, done_txt
+
+    def _render_task_card(self, t: Dict[str, Any]) -> Dict[str, Any]:
+        # built unpacked; render_tasks places it. Everything is gridded straight into
+        # the card (no inner left/right frames): each CTk widget is its own canvas,
+        # so fewer widgets per card is most of the cost of a large list.
+        # Callbacks read card["id"], so a recycled card acts on whichever task it shows.
+        card: Dict[str, Any] = {"id": t.get("id")}
+        frame = ctk.CTkFrame(self.tasks_frame, corner_radius=10)
+        frame.grid_columnconfigure(0, weight=1)
 
-        snooze_menu = ctk.CTkOptionMenu(right, values=[f"{m}m" for m in SNOOZE_OPTIONS], width=80, command=lambda val, id=t.get("id"): self._on_snooze_choice(id, val))
-        snooze_menu.set("Snooze")
-        snooze_menu.pack(side="right", padx=6)
+        title, meta, done_txt = texts = self._card_texts(t)
+        title_label = ctk.CTkLabel(frame, text=title, anchor="w", font=("Helvetica", 13, "bold"))
+        title_label.grid(row=0, column=0, sticky="ew", padx=(12, 6), pady=(6, 0))
+        meta_label = ctk.CTkLabel(frame, text=meta, anchor="w", font=("Helvetica", 10))
+        meta_label.grid(row=1, column=0, sticky="ew", padx=(12, 6), pady=(2, 6))
 
-        self._animate_widget_in(frame)
+        snooze_menu = ctk.CTkOptionMenu(frame, values=[f"{m}m" for m in SNOOZE_OPTIONS], width=80, command=lambda val: self._on_snooze_choice(card["id"], val))
+        snooze_menu.set("Snooze")
+        snooze_menu.grid(row=0, column=1, rowspan=2, padx=6)
+        ctk.CTkButton(frame, text="🗑", width=42, fg_color="#ff6b6b", hover_color="#ff8080", command=lambda: self.delete_task(card["id"])).grid(row=0, column=2, rowspan=2, padx=4)
+        ctk.CTkButton(frame, text="✎", width=42, command=lambda: self._open_edit_dialog(card["id"])).grid(row=0, column=3, rowspan=2, padx=4)
+        done_button = ctk.CTkButton(frame, text=done_txt, width=90, command=lambda: self.toggle_done(card["id"]))
+        done_button.grid(row=0, column=4, rowspan=2, padx=(4, 12))
+
+        card.update(frame=frame, title=title_label, meta=meta_label, done=done_button, snooze=snooze_menu, texts=texts)
+        return card
+
+    def _update_task_card(self, card: Dict[str, Any], t: Dict[str, Any]) -> None:
+        if card["id"] != t.get("id"):
+            # recycled for another task
+            card["id"] = t.get("id")
+            card["snooze"].set("Snooze")
+        texts = self._card_texts(t)
+        if texts == card["texts"]:
+            return
+        for key, old, new in zip(("title", "meta", "done"), card["texts"], texts):
+            if old != new:
+                card[key].configure(text=new)
+        card["texts"] = texts
+
+    def _viewport_rows(self, n: int):
+        # rows [top, bottom) currently on screen, estimated from the scroll position
+        canvas = self.tasks_frame._parent_canvas
+        top = int(canvas.yview()[0] * n)
+        return top, top + canvas.winfo_height() // CARD_ROW_HEIGHT + 1
+
+    def _visible_range(self, n: int):
+        top, bottom = self._viewport_rows(n)
+        return max(0, top - RENDER_OVERSCAN), min(n, bottom + RENDER_OVERSCAN)
+
+    def _on_list_scroll(self) -> None:
+        # re-render only once the viewport runs past the rendered slice (the overscan
+        # absorbs small scrolls)
+        n = len(self.tasks)
+        top, bottom = self._viewport_rows(n)
+        start, end = self._window
+        if (top < start or min(bottom, n) > end) and self._rewindow_job is None:
+            self._rewindow_job = self.after_idle(self._rewindow)
+
+    def _rewindow(self) -> None:
+        self._rewindow_job = None
+        self.render_tasks()
 
     def _open_edit_dialog(self, task_id: str) -> None:
-        task = next((x for x in self.tasks if x.get("id") == task_id), None)
+        task = self._task_by_id.get(task_id)
         if not task:
             return
         dlg = ctk.CTkToplevel(self)
@@ -401,19 +828,18 @@ class ToDoZen(ctk.CTk):
 
         ctk.CTkLabel(dlg, text=task.get("task", ""), font=("Helvetica", 12, "bold")).pack(pady=8)
         de = DateEntry(dlg)
-        due_dt = parse_iso(task.get("due"))
+        due_dt = task.get("_due_dt")
         if due_dt:
             de.set_date(due_dt.date())
         de.pack(pady=6)
 
-        hours = [f"{h:02d}" for h in range(24)]
-        mins = [f"{m:02d}" for m in range(0, 60, 5)]
-        hvar = ctk.StringVar(value=f"{due_dt.hour:02d}" if due_dt else f"{now_local().hour:02d}")
-        mvar = ctk.StringVar(value=f"{(due_dt.minute // 5) * 5:02d}" if due_dt else f"{now_local().minute:02d}")
+        shown = due_dt or now_local()
+        hvar = ctk.StringVar(value=f"{shown.hour:02d}")
+        mvar = ctk.StringVar(value=f"{(shown.minute // 5) * 5:02d}" if due_dt else f"{shown.minute:02d}")
 
-        hmenu = ctk.CTkOptionMenu(dlg, values=hours, variable=hvar, width=80)
+        hmenu = ctk.CTkOptionMenu(dlg, values=HOURS_24, variable=hvar, width=80)
         hmenu.pack(side="left", padx=12, pady=8)
-        mmenu = ctk.CTkOptionMenu(dlg, values=mins, variable=mvar, width=80)
+        mmenu = ctk.CTkOptionMenu(dlg, values=MINS_5, variable=mvar, width=80)
         mmenu.pack(side="left", padx=12, pady=8)
 
         def save_and_close() -> None:
@@ -437,17 +863,25 @@ class ToDoZen(ctk.CTk):
             pass
 
     # ---------------- Animations ----------------
-    def _animate_widget_in(self, widget, steps: int = 6, delay: int = 10) -> None:
-        def step(i: int) -> None:
-            pad = int(30 * (1 - (i / steps)))
-            try:
-                widget.pack_configure(padx=pad)
-                if i < steps:
-                    widget.after(delay, lambda: step(i + 1))
-            except Exception:
-                pass
+    def _animate_widget_in(self, widgets, hold: int = 350) -> None:
+        # flash new cards in the mood accent, then restore: two colour changes per
+        # batch and no geometry changes (animating padx re-laid out the whole list)
+        try:
+            base = widgets[0].cget("fg_color")
+            accent = self.moods[self.current_mood]["accent"]
+            for w in widgets:
+                w.configure(fg_color=accent)
+        except Exception:
+            return
 
-        step(0)
+        def restore() -> None:
+            for w in widgets:
+                try:
+                    w.configure(fg_color=base)
+                except Exception:
+                    pass  # card deleted meanwhile
+
+        self.after(hold, restore)
 
     def _pulse_add_button(self) -> None:
         try:
@@ -502,44 +936,49 @@ class ToDoZen(ctk.CTk):
         except Exception:
             pass
 
-    def _start_notifier(self) -> None:
-        if self._notifier_thread and self._notifier_thread.is_alive():
-            return
-        self._stop_event.clear()
-        self._notifier_thread = threading.Thread(target=self._notifier_loop, daemon=True)
-        self._notifier_thread.start()
+    def _schedule_notifier(self) -> None:
+        # (re)aim the timer at the next due task; called whenever due state changes
+        if self._notify_job is not None:
+            self.after_cancel(self._notify_job)
+        wait = self._next_notify_wait(now_local())
+        self._notify_job = self.after(int(wait * 1000), self._notifier_tick)
 
-    def _notifier_loop(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                now = now_local()
-                for t in list(self.tasks):
-                    try:
-                        if t.get("done"):
-                            continue
-                        if t.get("notified"):
-                            continue
-                        due = parse_iso(t.get("due"))
-                        if not due:
-                            continue
-                        window_start = now - timedelta(minutes=1)
-                        window_end = now + timedelta(minutes=NOTIFY_LOOKAHEAD_MIN)
-                        if window_start <= due <= window_end:
-                            title = f"Reminder: {t.get('task')}"
-                            body = f"{t.get('category','General')} • Due {due.strftime('%Y-%m-%d %H:%M')}"
-                            try:
-                                notification.notify(title=title, message=body, timeout=8)
-                            except Exception:
-                                pass
-                            t["notified"] = True
-                            self._persist()
-                            self._show_inapp_notification(t)
-                    except Exception:
-                        traceback.print_exc()
-                time.sleep(NOTIFY_CHECK_INTERVAL)
-            except Exception:
-                traceback.print_exc()
-                time.sleep(2)
+    def _notifier_tick(self) -> None:
+        self._notify_job = None
+        try:
+            now = now_local()  # one clock read per tick
+            for t in self._pop_due(now):
+                try:
+                    due = t["_due_dt"]
+                    title = f"Reminder: {t.get('task')}"
+                    body = f"{t.get('category','General')} • Due {due.strftime('%Y-%m-%d %H:%M')}"
+                    # plyer backends can block (dbus, balloon tips), keep them off the Tk thread
+                    threading.Thread(target=self._notify_desktop, args=(title, body), daemon=True).start()
+                    t["notified"] = True
+                    self._mark_dirty(t["id"])
+                    self._show_inapp_notification(t)
+                except Exception:
+                    traceback.print_exc()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if self._notify_job is None:
+                self._schedule_notifier()
+
+    @staticmethod
+    def _notify_desktop(title: str, body: str) -> None:
+        try:
+            notification.notify(title=title, message=body, timeout=8)
+        except Exception:
+            pass
+
+    def _next_notify_wait(self, now: datetime) -> float:
+        # time until the next pending task enters the notify window
+        due = self._peek_due(now - timedelta(minutes=1))
+        if due is None:
+            return NOTIFY_IDLE_SLEEP
+        wait = (due - timedelta(minutes=NOTIFY_LOOKAHEAD_MIN) - now).total_seconds()
+        return min(max(NOTIFY_MIN_SLEEP, wait), NOTIFY_IDLE_SLEEP)
 
     def _show_inapp_notification(self, task: Dict[str, Any]) -> None:
         try:
@@ -547,7 +986,7 @@ class ToDoZen(ctk.CTk):
             top.title("Task Due")
             top.geometry("360x130")
             ctk.CTkLabel(top, text=f"⏰ {task.get('task')}", font=("Helvetica", 12, "bold")).pack(pady=(8, 4))
-            due = parse_iso(task.get("due"))
+            due = task.get("_due_dt")
             ctk.CTkLabel(top, text=f"Due: {due.strftime('%Y-%m-%d %H:%M') if due else '—'}", font=("Helvetica", 10)).pack()
             btn_frame = ctk.CTkFrame(top, fg_color="transparent")
             btn_frame.pack(pady=8)
@@ -561,14 +1000,13 @@ class ToDoZen(ctk.CTk):
     # ---------------- Lifecycle ----------------
     def on_close(self) -> None:
         try:
-            self._stop_event.set()
-            # give notifier thread a moment
-            if self._notifier_thread and self._notifier_thread.is_alive():
-                self._notifier_thread.join(timeout=1.0)
+            if self._notify_job is not None:
+                self.after_cancel(self._notify_job)
+                self._notify_job = None
         except Exception:
             pass
         finally:
-            self._persist()
+            self._persist_now()
             self.destroy()
 
 
@@ -16,15 +16,25 @@ Single-file app:
 - Password-protected profiles (bcrypt)
 """
 import os
+import sys
 import json
 import threading
+import queue
 import time
 import traceback
 import sqlite3
+import asyncio
 import math
+import heapq
+import gzip
+import importlib.util
 from datetime import datetime, timedelta, date
 from uuid import uuid4
-from functools import partial
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import Counter
+from itertools import chain, groupby
+from operator import itemgetter
 
 # Third-party imports with friendly error messages
 try:
@@ -33,10 +43,6 @@ try:
     from plyer import notification
     from dateutil.relativedelta import relativedelta
     import schedule
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import pyttsx3
-    import speech_recognition as sr
     import bcrypt
 except Exception as e:
     print("Missing libraries or environment packages. Run:")
@@ -45,25 +51,58 @@ except Exception as e:
 
 # Optional libraries
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, ReplaceOne, DeleteOne
 except Exception:
     MongoClient = None
+    ReplaceOne = DeleteOne = None
 
+# Optional orjson (C JSON codec); stdlib json otherwise. Both produce/accept UTF-8 bytes.
 try:
-    import pystray
-    from PIL import Image, ImageDraw
+    import orjson
+
+    def json_dumps(obj, indent=False, default=None):
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    json_loads = orjson.loads
 except Exception:
-    pystray = None
+    def json_dumps(obj, indent=False, default=None):
+        return json.dumps(obj, indent=2 if indent else None, default=default, ensure_ascii=False).encode("utf-8")
+
+    json_loads = json.loads
+
+# Heavy optional features (matplotlib, pyttsx3, speech_recognition, pystray/PIL)
+# are imported at first use so startup doesn't pay for them
+def has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+def missing_module(pip_name, feature):
+    print(f"{feature} needs an extra package. Run:")
+    print(f" python -m pip install {pip_name}")
 
 # -------------------------
 # CONFIG
 # -------------------------
 APP_TITLE = "🪷 ToDoZen — Full Suite"
 DB_FILE = "todozen_local.db"
-JSON_BACKUP = "todozen_backup.json"
+JSON_BACKUP = "todozen_backup.jsonl.gz"  # one task per line, gzip level 1
+# older backups, tried in order when JSON_BACKUP is missing
+LEGACY_JSON_BACKUPS = ("todozen_backup.jsonl", "todozen_backup.json")
+GZIP_MAGIC = b"\x1f\x8b"
+IMPORT_BATCH = 500  # backup rows per executemany while streaming an import
 DEFAULT_LOCAL_MONGO_URI = "mongodb://localhost:27017/todozen"
 NOTIFY_CHECK_INTERVAL = 15  # seconds
+NOTIFY_DRAIN_MS = 200  # how often the UI picks up notifier results
+NOTIFY_LATE_GRACE = 60  # seconds past due a reminder may still fire
 DEFAULT_SNOOZE_OPTIONS = [5, 10, 15, 30, 60]
+DUE_NEVER = float("inf")  # sort key for tasks without a due time
+ANIMATE_FRAME_MS = 16  # ~60fps ticker shared by every card slide-in
+RENDER_COALESCE_MS = 50  # bursts of task changes share one list render
+WRITE_BATCH_MS = 50  # task writes within this window share one commit
+MONGO_BATCH = 64  # max ops per mongo bulk_write
+MONGO_BATCH_WAIT = 0.1  # seconds to gather more ops after the first
+MONGO_CLOSE_TIMEOUT = 3.0  # seconds to wait for pending mongo writes on close
+BCRYPT_ROUNDS = 10  # ~60ms per hash; the library default of 12 is ~4x slower
+CARD_ACTION_TAG = "ToDoZenCardAction"  # bindtag shared by every task-card control
 THEMES = {
     "Dark": {"bg": "#0b0b0d", "accent": "#2b9cff", "text": "#e6eef9"},
     "Calm": {"bg": "#0f1720", "accent": "#60a5a5", "text": "#e6eef9"},
@@ -71,6 +110,28 @@ THEMES = {
     "Sunset": {"bg": "#1a0b07", "accent": "#ff8a65", "text": "#ffece6"},
 }
 
+# due is stored as INTEGER epoch seconds
+TASKS_TABLE_SQL = """
+CREATE TABLE {name} (
+    id TEXT PRIMARY KEY,
+    user TEXT,
+    title TEXT,
+    category TEXT,
+    due INTEGER,
+    created TEXT,
+    done INTEGER,
+    recurrence TEXT,
+    recurrence_extra TEXT,
+    notified INTEGER,
+    xp INTEGER
+)
+"""
+
+TASK_UPSERT_SQL = """
+INSERT OR REPLACE INTO tasks (id,user,title,category,due,created,done,recurrence,recurrence_extra,notified,xp)
+VALUES (?,?,?,?,?,?,?,?,?,?,?)
+"""
+
 # -------------------------
 # Storage Layer (SQLite + optional Mongo)
 # -------------------------
@@ -80,30 +141,36 @@ class Storage:
         self.mongo_uri = os.getenv("MONGO_URI") or mongo_uri or DEFAULT_LOCAL_MONGO_URI
         self.mongo_client = None
         self.mongo_collection = None
+        # replication wanted; the connection itself is made on the mongo thread
+        self.mongo_sync = MongoClient is not None
+        # task writes are queued and committed together by flush(); on_write, if set,
+        # is called after each queued write to arm a deferred flush (the app uses Tk after)
+        self._write_queue = []
+        self._pending_sync = {}  # id -> doc to replicate after flush (None: read it back)
+        self._write_lock = threading.Lock()
+        self.on_write = None
+        # mongo connect + replication run on their own thread: ("upsert", id, doc),
+        # ("delete", id, None) or ("connect", None, on_ready)
+        self._mongo_q = queue.Queue()
+        self._mongo_thread = threading.Thread(target=self._mongo_worker, daemon=True)
+        self._mongo_thread.start()
+        # one sqlite connection per thread (see conn); all tracked for close()
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._synchronous = "NORMAL"
         self._ensure_sqlite()
-        self._init_mongo_if_available()
 
     def _ensure_sqlite(self):
         created = not os.path.exists(self.db_path)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
         cur = self.conn.cursor()
         # tasks table
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id TEXT PRIMARY KEY,
-            user TEXT,
-            title TEXT,
-            category TEXT,
-            due TEXT,
-            created TEXT,
-            done INTEGER,
-            recurrence TEXT,
-            recurrence_extra TEXT,
-            notified INTEGER,
-            xp INTEGER
-        )
-        """)
+        cur.execute(TASKS_TABLE_SQL.format(name="IF NOT EXISTS tasks"))
+        self._migrate_due_to_epoch()
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_due ON tasks(user, due)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_done ON tasks(user, done)")
+        # notifier window: equality on user/done/notified, range on due
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_pending_due ON tasks(user, done, notified, due)")
         # users table
         cur.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -116,6 +183,65 @@ class Storage:
         """)
         self.conn.commit()
 
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # single-user desktop db: WAL + NORMAL sync appends a WAL frame per commit
+        # instead of a full fsync; only the last few writes are at risk on power loss.
+        # WAL also lets one thread read while another commits.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+        return conn
+
+    @property
+    def conn(self):
+        # per-thread connection: the notifier thread's queries and commits no longer
+        # share (and interleave transactions on) the UI thread's handle
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _migrate_due_to_epoch(self):
+        # older databases stored due as ISO text; rebuild the table with an INTEGER
+        # column (TEXT affinity would turn stored ints back into strings)
+        cols = {r["name"]: r["type"] for r in self.conn.execute("PRAGMA table_info(tasks)")}
+        if cols.get("due", "").upper() != "TEXT":
+            return
+        rows = self.conn.execute("SELECT id, due FROM tasks").fetchall()
+        self.conn.execute("BEGIN")
+        self.conn.execute("ALTER TABLE tasks RENAME TO tasks_old")
+        self.conn.execute("DROP INDEX IF EXISTS idx_tasks_user_due")
+        self.conn.execute("DROP INDEX IF EXISTS idx_tasks_user_done")
+        self.conn.execute(TASKS_TABLE_SQL.format(name="tasks"))
+        self.conn.execute("INSERT INTO tasks SELECT * FROM tasks_old")
+        self.conn.execute("DROP TABLE tasks_old")
+        self.conn.executemany("UPDATE tasks SET due=? WHERE id=?", [(to_epoch(r["due"]), r["id"]) for r in rows])
+        self.conn.commit()
+
+    def set_fast_writes(self, enabled):
+        # synchronous=OFF hands writes to the OS without waiting for the disk
+        self._synchronous = "OFF" if enabled else "NORMAL"
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.execute(f"PRAGMA synchronous={self._synchronous}")
+
+    @contextmanager
+    def _bulk_load(self):
+        # one transaction with synchronous=OFF for bulk upserts; the previous
+        # level is restored afterwards (the pragma can't change mid-transaction)
+        prev = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.conn.execute("PRAGMA synchronous=OFF")
+        try:
+            with self.conn:
+                yield
+        finally:
+            self.conn.execute(f"PRAGMA synchronous={prev}")
+
     def _init_mongo_if_available(self):
         if MongoClient is None:
             print("pymongo not installed — Mongo sync disabled")
@@ -131,66 +257,160 @@ class Storage:
             print("Mongo connect failed — continuing with SQLite. Error:", e)
             self.mongo_client = None
             self.mongo_collection = None
+            self.mongo_sync = False
+
+    def set_mongo_sync(self, enabled, on_ready=None):
+        # enabling connects on the mongo thread (server selection can take seconds);
+        # on_ready(ok) is called from that thread once the outcome is known
+        if not enabled or MongoClient is None:
+            self.mongo_sync = False
+            if enabled and on_ready:
+                on_ready(False)
+            return
+        self.mongo_sync = True
+        self._mongo_q.put(("connect", None, on_ready))
 
     # SQL helpers
-    def add_task(self, task):
-        cur = self.conn.cursor()
-        cur.execute("""
-        INSERT OR REPLACE INTO tasks (id,user,title,category,due,created,done,recurrence,recurrence_extra,notified,xp)
-        VALUES (?,?,?,?,?,?,?,?,?,?,?)
-        """, (
+    def _task_row(self, task):
+        return (
             task.get("id") or str(uuid4()),
             task.get("user"),
             task.get("title"),
             task.get("category"),
-            task.get("due"),
+            to_epoch(task.get("due")),
             task.get("created") or datetime.utcnow().isoformat(),
             1 if task.get("done") else 0,
             task.get("recurrence") or "none",
-            json.dumps(task.get("recurrence_extra", {})),
+            encode_extra(task.get("recurrence_extra")),
             1 if task.get("notified") else 0,
             task.get("xp", 0)
-        ))
-        self.conn.commit()
+        )
+
+    def _queue_write(self, sql, params, sync_id=None, doc=None):
+        with self._write_lock:
+            self._write_queue.append((sql, params))
+            if sync_id:
+                self._pending_sync[sync_id] = doc
+        if self.on_write:
+            self.on_write()
+        else:
+            self.flush()
+
+    def flush(self):
+        # commit queued writes in one transaction; runs of the same statement go
+        # through executemany
+        with self._write_lock:
+            queue, self._write_queue = self._write_queue, []
+            pending, self._pending_sync = self._pending_sync, {}
+            if queue:
+                with self.conn:
+                    for sql, group in groupby(queue, key=itemgetter(0)):
+                        self.conn.executemany(sql, [params for _, params in group])
+        if pending and self.mongo_sync:
+            docs = [d for d in pending.values() if d]
+            missing = [id_ for id_, d in pending.items() if not d]
+            if missing:
+                marks = ",".join("?" * len(missing))
+                cur = self.conn.cursor()
+                cur.execute(f"SELECT * FROM tasks WHERE id IN ({marks})", missing)
+                docs += [dict(r) for r in cur.fetchall()]
+            self._sync_tasks_to_mongo(docs)
+
+    def add_task(self, task):
+        task["id"] = task.get("id") or str(uuid4())
+        task["due"] = to_epoch(task.get("due"))
+        self._queue_write(TASK_UPSERT_SQL, self._task_row(task))
         # optionally sync to mongo
         self._sync_task_to_mongo(task)
+        return task
 
-    def update_task(self, id_, **fields):
+    def add_tasks_bulk(self, tasks):
+        # one transaction (one fsync) for the whole batch instead of one per task
+        for t in tasks:
+            t["id"] = t.get("id") or str(uuid4())
+            t["due"] = to_epoch(t.get("due"))
+        rows = [self._task_row(t) for t in tasks]
+        self.flush()
+        with self._bulk_load():
+            self.conn.executemany(TASK_UPSERT_SQL, rows)
+        self._sync_tasks_to_mongo(tasks)
+
+    def update_task(self, id_, mongo_doc=None, **fields):
         cols = ",".join([f"{k}=?" for k in fields.keys()])
         vals = list(fields.values()) + [id_]
-        cur = self.conn.cursor()
-        cur.execute(f"UPDATE tasks SET {cols} WHERE id=?", vals)
-        self.conn.commit()
+        # the doc is synced to mongo after the flush that writes it; callers that
+        # already hold the updated task pass it as mongo_doc so it isn't read back
+        self._queue_write(f"UPDATE tasks SET {cols} WHERE id=?", vals, sync_id=id_, doc=mongo_doc)
+
+    def complete_task(self, id_, xp, username, coins, streak, last_completed):
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE tasks SET done=1, xp=? WHERE id=?", (xp, id_))
+            self.conn.execute("UPDATE users SET coins=?, streak=?, last_completed=? WHERE username=?",
+                              (coins, streak, last_completed, username))
         # optionally sync single doc
         doc = self.get_task(id_)
         if doc:
-            self._sync_task_to_mongo(dict(doc))
+            self._sync_task_to_mongo(doc)
+
+    def mark_notified(self, tasks):
+        # one UPDATE ... WHERE id IN (...) for every task fired in a notifier tick
+        if not tasks:
+            return
+        ids = [t["id"] for t in tasks]
+        self.flush()
+        with self.conn:
+            self.conn.execute(f"UPDATE tasks SET notified=1 WHERE id IN ({','.join('?' * len(ids))})", ids)
+        for t in tasks:
+            t["notified"] = 1
+        self._sync_tasks_to_mongo(tasks)
 
     def delete_task(self, id_):
+        self.flush()  # a queued upsert must not resurrect the row
         cur = self.conn.cursor()
         cur.execute("DELETE FROM tasks WHERE id=?", (id_,))
         self.conn.commit()
-        if self.mongo_collection:
-            try:
-                self.mongo_collection.delete_one({"id": id_})
-            except Exception:
-                pass
+        if self.mongo_sync:
+            self._mongo_q.put(("delete", id_, None))
 
     def get_task(self, id_):
+        self.flush()
         cur = self.conn.cursor()
         cur.execute("SELECT * FROM tasks WHERE id=?", (id_,))
         row = cur.fetchone()
         return dict(row) if row else None
 
-    def list_tasks(self, user=None):
-        cur = self.conn.cursor()
+    def list_tasks(self, user=None, done=None, due_before=None):
+        # filters are pushed into SQL so the (user, due)/(user, done) indexes apply
+        clauses, params = [], []
         if user:
-            cur.execute("SELECT * FROM tasks WHERE user=?", (user,))
-        else:
-            cur.execute("SELECT * FROM tasks")
+            clauses.append("user=?")
+            params.append(user)
+        if done is not None:
+            clauses.append("done=?")
+            params.append(1 if done else 0)
+        if due_before is not None:
+            clauses.append("due < ?")
+            params.append(due_before)
+        sql = "SELECT * FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        self.flush()
+        cur = self.conn.cursor()
+        cur.execute(sql, params)
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def list_due_between(self, user, start, end):
+        # start/end are epoch seconds; a range scan on (user, done, notified, due)
+        self.flush()
+        cur = self.conn.cursor()
+        cur.execute("""
+        SELECT * FROM tasks WHERE user=? AND done=0 AND notified=0 AND due BETWEEN ? AND ?
+        ORDER BY due LIMIT 64
+        """, (user, start, end))
+        return [dict(r) for r in cur.fetchall()]
+
     # user management
     def add_user(self, username, password_hash):
         cur = self.conn.cursor()
@@ -214,37 +434,181 @@ class Storage:
     # backup/restore
     def export_json(self, path=JSON_BACKUP):
         tasks = self.list_tasks()
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(tasks, f, default=str, indent=2)
+        # level 1 keeps most of the size win for a fraction of the CPU
+        opener = (lambda p: gzip.open(p, "wb", compresslevel=1)) if path.endswith(".gz") else (lambda p: open(p, "wb"))
+        with opener(path) as f:
+            for t in tasks:
+                f.write(json_dumps(t, default=str) + b"\n")
         return path
 
-    def import_json(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            tasks = json.load(f)
+    def import_json(self, path, progress=None):
+        # streams the backup IMPORT_BATCH rows at a time, all inside one transaction;
+        # progress(count) is called after each batch. Returns the number imported.
+        self.flush()
+        count = 0
+        batch = []
+
+        def write_batch():
+            self.conn.executemany(TASK_UPSERT_SQL, [self._task_row(t) for t in batch])
+            self._sync_tasks_to_mongo(batch)
+            if progress:
+                progress(count)
+            batch.clear()
+
+        with open_backup(path) as f, self._bulk_load():
+            for t in iter_backup_tasks(f):
+                t["id"] = t.get("id") or str(uuid4())
+                t["due"] = to_epoch(t.get("due"))
+                batch.append(t)
+                count += 1
+                if len(batch) >= IMPORT_BATCH:
+                    write_batch()
+            if batch:
+                write_batch()
+        return count
+
+    # mongo sync helpers: these only enqueue; _mongo_worker does the network I/O
+    def _sync_tasks_to_mongo(self, tasks):
         for t in tasks:
-            self.add_task(t)
+            self._sync_task_to_mongo(t)
 
-    # mongo sync helper
     def _sync_task_to_mongo(self, task):
-        if not self.mongo_collection:
+        if not self.mongo_sync:
             return
-        try:
-            doc = task.copy()
-            doc["id"] = doc.get("id") or str(uuid4())
-            self.mongo_collection.replace_one({"id": doc["id"]}, doc, upsert=True)
-        except Exception:
-            pass
+        doc = stored_fields(task)
+        doc["id"] = doc.get("id") or str(uuid4())
+        self._mongo_q.put(("upsert", doc["id"], doc))
+
+    def _mongo_worker(self):
+        # gathers up to MONGO_BATCH ops (or whatever arrives within MONGO_BATCH_WAIT)
+        # into one unordered bulk_write; the last op per id wins, so order is moot.
+        # Ops queued before the connection exists wait here; if it fails they're dropped.
+        if self.mongo_sync:
+            self._init_mongo_if_available()
+        while True:
+            item = self._mongo_q.get()
+            batch = [item]
+            deadline = time.monotonic() + MONGO_BATCH_WAIT
+            while item is not None and len(batch) < MONGO_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._mongo_q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+            latest = {}
+            for op in batch:
+                if op is None:
+                    continue
+                if op[0] == "connect":
+                    if self.mongo_collection is None:
+                        self._init_mongo_if_available()
+                    if op[2]:
+                        op[2](self.mongo_collection is not None)
+                    continue
+                latest[op[1]] = op
+            coll = self.mongo_collection
+            if latest and coll is not None and self.mongo_sync:
+                ops = [ReplaceOne({"id": id_}, doc, upsert=True) if kind == "upsert" else DeleteOne({"id": id_})
+                       for kind, id_, doc in latest.values()]
+                try:
+                    coll.bulk_write(ops, ordered=False)
+                except Exception:
+                    pass
+            if batch[-1] is None:
+                return
+
+    def close(self):
+        # commit queued writes, let the mongo worker drain, then close the db
+        self.flush()
+        self._mongo_q.put(None)
+        self._mongo_thread.join(timeout=MONGO_CLOSE_TIMEOUT)
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
 
 # -------------------------
 # Utilities & Helpers
 # -------------------------
+@lru_cache(maxsize=4096)
 def parse_iso(s):
     try:
         return datetime.fromisoformat(s)
     except Exception:
         return None
 
+def to_epoch(v):
+    # due as int epoch seconds, from a datetime, an ISO string (older rows and
+    # backups) or an epoch value
+    if v is None or v == "":
+        return None
+    if isinstance(v, datetime):
+        return int(v.timestamp())
+    if isinstance(v, str):
+        dt = parse_iso(v)
+        return int(dt.timestamp()) if dt else None
+    return int(v)
+
+def from_epoch(ts):
+    return datetime.fromtimestamp(ts) if ts is not None else None
+
+# due values repeat across counter updates and card re-renders (every toggle and
+# snooze un-counts and re-counts a task), so their conversions are memoized
+@lru_cache(maxsize=4096)
+def due_day(ts):
+    return datetime.fromtimestamp(ts).date()
+
+@lru_cache(maxsize=4096)
+def _format_epoch(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
+
+def set_due(task, dt):
+    task["due"] = to_epoch(dt)
+
+def open_backup(path):
+    # gzip is detected from the magic bytes, not the extension
+    with open(path, "rb") as f:
+        gz = f.read(2) == GZIP_MAGIC
+    return gzip.open(path, "rb") if gz else open(path, "rb")
+
+def iter_backup_tasks(f):
+    # yields tasks from a binary backup file: JSONL, or a legacy single JSON array
+    first = f.readline()
+    if first.lstrip().startswith(b"["):
+        yield from json_loads(first + f.read())
+        return
+    for line in chain((first,), f):
+        if line.strip():
+            yield json_loads(line)
+
+def stored_fields(task):
+    # drop in-memory cache keys (leading underscore) before a task leaves the process
+    return {k: v for k, v in task.items() if not k.startswith("_")}
+
+# NEXT_WEEKDAY_DELTA[wd][mask]: days from weekday wd to the next weekday whose bit
+# is set in the 7-bit mask (7 if only wd itself is set); 0 for an empty mask
+NEXT_WEEKDAY_DELTA = [
+    [next((k for k in range(1, 8) if mask >> ((wd + k) % 7) & 1), 0) for mask in range(128)]
+    for wd in range(7)
+]
+
+# recurrence_extra is JSON text in SQLite and a dict in memory
+def decode_extra(v):
+    if isinstance(v, (str, bytes)):
+        return json_loads(v) if v else {}
+    return v or {}
+
+def encode_extra(v):
+    if isinstance(v, (dict, list)):
+        return json_dumps(v).decode("utf-8") if v else "{}"
+    return v or "{}"
+
 def human_dt(dt):
+    if isinstance(dt, (int, float)):
+        return _format_epoch(dt)
     try:
         return dt.strftime("%Y-%m-%d %H:%M")
     except Exception:
@@ -256,16 +620,44 @@ def next_month(dt):
 # ......................
 # GAMIFICATION: XP logic
 # ......................
+# base XP per lowercased category; unknown categories are resolved once by category_xp()
+CAT_XP = {"general": 10, "personal": 10, "study": 10, "work": 15, "urgent": 20, "important": 20}
+
+def category_xp(category):
+    # intern the category's base XP: substring rules run once per distinct category string
+    key = (category or "").lower()
+    xp = CAT_XP.get(key)
+    if xp is None:
+        xp = 10
+        if "work" in key:
+            xp += 5
+        if "urgent" in key or "important" in key:
+            xp += 10
+        CAT_XP[key] = xp
+    return xp
+
 def award_xp_for_task(task):
-    # simple heuristic: base XP by category or length
-    base = 10
-    cat = (task.get("category") or "").lower()
-    if "work" in cat:
-        base += 5
-    if "urgent" in cat or "important" in cat:
-        base += 10
-    base += min(20, len(task.get("title","")) // 5)
-    return base
+    # base XP by category (cached on the task as _cat_xp) plus a bonus for title length
+    base = task.get("_cat_xp")
+    if base is None:
+        base = category_xp(task.get("category"))
+    return base + min(20, len(task.get("title", "")) // 5)
+
+# -------------------------
+# Tray icon pixels
+# -------------------------
+def _make_tray_icon(size):
+    # a filled circle on black, inset by 1/8 of the side, as raw RGB bytes; plain
+    # Python so the icon exists at import without pulling in PIL
+    c, r2 = size / 2, (size * 3 / 8) ** 2
+    fg, bg = bytes((43, 156, 255)), bytes(3)
+    return b"".join(fg if (x + 0.5 - c) ** 2 + (y + 0.5 - c) ** 2 <= r2 else bg
+                    for y in range(size) for x in range(size))
+
+# trays draw at 16px (32px on macOS); a larger bitmap would only be scaled down
+_TRAY_ICON_SIDE = 32 if sys.platform == "darwin" else 16
+TRAY_ICON_SIZE = (_TRAY_ICON_SIDE, _TRAY_ICON_SIDE)
+TRAY_ICON_BYTES = _make_tray_icon(_TRAY_ICON_SIDE)
 
 # -------------------------
 # Notification helper (plyer)
@@ -284,6 +676,11 @@ def tts_speak(text):
     global _engine
     try:
         if _engine is None:
+            try:
+                import pyttsx3
+            except ImportError:
+                missing_module("pyttsx3", "Text-to-speech")
+                return
             _engine = pyttsx3.init()
         _engine.say(text)
         _engine.runAndWait()
@@ -291,6 +688,11 @@ def tts_speak(text):
         pass
 
 def speech_to_text(timeout=5, phrase_time_limit=7):
+    try:
+        import speech_recognition as sr
+    except ImportError:
+        missing_module("speechrecognition", "Voice add")
+        return ""
     r = sr.Recognizer()
     with sr.Microphone() as source:
         r.adjust_for_ambient_noise(source, duration=0.5)
@@ -314,22 +716,64 @@ class ToDoZenApp(ctk.CTk):
         self.title(APP_TITLE)
         self.geometry("1100x760")
         self.minsize(900, 600)
-        self.tasks = []  # cached tasks for current user
+        self.tasks_by_id = {}  # authoritative in-memory tasks for current user; writes go through to storage
+        self._reset_counts()
         self.snooze_options = DEFAULT_SNOOZE_OPTIONS
+        # batch storage writes made within WRITE_BATCH_MS into one commit
+        self._storage_flush_job = None
+        # coalesced render_task_list (see _schedule_render)
+        self._render_job = None
+        self._render_reload = False
+        # card slide-ins in flight: widget -> (start, duration); one shared ticker
+        self._animating = {}
+        self._animate_job = None
+        # one authenticated SMTP session reused across sends (see _get_smtp)
+        self._smtp = None
+        self._smtp_key = None
+        self._smtp_lock = threading.Lock()
+        self._toast_win = None  # reusable toast window, created on first _toast
+        self._toast_lbl = None
+        self._toast_job = None
+        # window origin for toast placement, refreshed only when the window moves
+        self._root_origin = None
+        self.bind("<Configure>", self._cache_origin, add="+")
+        # shared asyncio loop thread for network I/O; started on first use
+        self._aio_loop = None
+        self._asmtp = None  # aiosmtplib session, only touched on _aio_loop
+        self._asmtp_key = None
+        self.storage.on_write = self._schedule_storage_flush
 
         self._stop_thread = threading.Event()
+        # (due epoch, task id) min-heap; the notifier sleeps until its earliest entry
+        # and is woken early when _schedule_due pushes a new earliest one
+        self._due_heap = []
+        self._due_lock = threading.Lock()
+        self._due_wake = threading.Event()
+        # notifier thread -> Tk thread handoff: (task, reason); drained with after()
+        self._notify_q = queue.SimpleQueue()
         self._notifier_thread = threading.Thread(target=self._notifier_loop, daemon=True)
         self._notifier_thread.start()
+        self.after(NOTIFY_DRAIN_MS, self._drain_notifier_queue)
 
+        # login and main screens are built once and swapped with pack_forget()/pack()
+        self._login_frame = None
+        self._main_frame = None
         self._build_login_ui()
 
     # -------------------------
     # LOGIN / PROFILE UI
     # -------------------------
     def _build_login_ui(self):
-        for w in self.winfo_children(): w.destroy()
+        if self._main_frame is not None:
+            self._main_frame.pack_forget()
+        if self._login_frame is None:
+            self._login_frame = self._create_login_frame()
+        else:
+            self.login_pass.delete(0, "end")
+        self._login_frame.pack(expand=True, fill="both", padx=30, pady=30)
+
+    def _create_login_frame(self):
         frm = ctk.CTkFrame(self, corner_radius=12)
-        frm.pack(expand=True, fill="both", padx=30, pady=30)
 
         ctk.CTkLabel(frm, text="ToDoZen — sign in / register", font=("Helvetica", 22, "bold")).pack(pady=12)
         container = ctk.CTkFrame(frm)
@@ -347,6 +791,7 @@ class ToDoZenApp(ctk.CTk):
         ctk.CTkButton(btn_frame, text="Sign in", command=self._signin).pack(side="left", padx=8)
         ctk.CTkButton(btn_frame, text="Register", command=self._register).pack(side="left", padx=8)
         ctk.CTkButton(btn_frame, text="Continue as Guest", command=self._continue_as_guest).pack(side="left", padx=8)
+        return frm
 
     def _signin(self):
         u = self.login_user.get().strip()
@@ -359,19 +804,31 @@ class ToDoZenApp(ctk.CTk):
             from tkinter import messagebox
             messagebox.showerror("No user", "User not found. Register first.")
             return
-        if bcrypt.checkpw(p, user["password_hash"]):
+        # bcrypt is deliberately slow; check on a worker and finish on the Tk thread
+        def _check():
+            ok = bcrypt.checkpw(p, user["password_hash"])
+            self.after(0, lambda: self._finish_signin(u, ok))
+        threading.Thread(target=_check, daemon=True).start()
+
+    def _finish_signin(self, u, ok):
+        if ok:
             self.current_user = u
             self._build_main_ui()
         else:
             from tkinter import messagebox
             messagebox.showerror("Wrong", "Password incorrect.")
 
-    def register_user(self):
+    def _register(self):
         u = self.login_user.get().strip()
         p = self.login_pass.get().encode("utf-8")
         if not u or not p:
             return
-        hashed = bcrypt.hashpw(p, bcrypt.gensalt())
+        def _hash():
+            hashed = bcrypt.hashpw(p, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+            self.after(0, lambda: self._finish_register(u, hashed))
+        threading.Thread(target=_hash, daemon=True).start()
+
+    def _finish_register(self, u, hashed):
         self.storage.add_user(u, hashed)
         self.current_user = u
         self._build_main_ui()
@@ -385,11 +842,26 @@ class ToDoZenApp(ctk.CTk):
     # MAIN UI (tabs)
     # -------------------------
     def _build_main_ui(self):
-        for w in self.winfo_children(): w.destroy()
+        if self._login_frame is not None:
+            self._login_frame.pack_forget()
+        if self._main_frame is None:
+            self._main_frame = self._create_main_frame()
+        else:
+            self._user_label.configure(text=f"🪷 ToDoZen • {self.current_user}")
+        self._main_frame.pack(fill="both", expand=True)
+
+        # (re)load the signed-in user's tasks; render_task_list diffs against existing cards
+        self._load_tasks()
+        self.render_task_list()
+        self._on_theme_change(self.theme_var.get())
+
+    def _create_main_frame(self):
+        root = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
         # top frame: title + user + theme select + quick voice add
-        top = ctk.CTkFrame(self, corner_radius=8)
+        top = ctk.CTkFrame(root, corner_radius=8)
         top.pack(fill="x", padx=12, pady=8)
-        ctk.CTkLabel(top, text=f"🪷 ToDoZen • {self.current_user}", font=("Helvetica", 18, "bold")).pack(side="left", padx=8)
+        self._user_label = ctk.CTkLabel(top, text=f"🪷 ToDoZen • {self.current_user}", font=("Helvetica", 18, "bold"))
+        self._user_label.pack(side="left", padx=8)
         # theme
         self.theme_var = ctk.StringVar(value="Dark")
         theme_menu = ctk.CTkOptionMenu(top, values=list(THEMES.keys()), variable=self.theme_var, command=self._on_theme_change, width=140)
@@ -398,7 +870,7 @@ class ToDoZenApp(ctk.CTk):
         ctk.CTkButton(top, text="🎤 Voice Add", command=self._voice_add).pack(side="right", padx=8)
 
         # Notebook tabs
-        self.tabs = ctk.CTkTabview(self, width=1000)
+        self.tabs = ctk.CTkTabview(root, width=1000)
         self.tabs.pack(padx=12, pady=12, fill="both", expand=True)
         self.tabs.add("Tasks")
         self.tabs.add("Dashboard")
@@ -412,11 +884,7 @@ class ToDoZenApp(ctk.CTk):
 
         # system tray init (optional)
         self._maybe_init_tray_icon()
-
-        # initial load
-        self._load_tasks()
-        self.render_task_list()
-        self._on_theme_change(self.theme_var.get())
+        return root
 
     # -------------------------
     # Tasks tab
@@ -457,6 +925,12 @@ class ToDoZenApp(ctk.CTk):
         # tasks list area
         self.tasks_list_frame = ctk.CTkScrollableFrame(tab, label_text="Your Tasks", width=980, height=420)
         self.tasks_list_frame.pack(padx=12, pady=12, fill="both", expand=True)
+        self.bind_class(CARD_ACTION_TAG, "<Button-1>", self._on_card_click)
+        self._snooze_target = None
+        # rendered cards by task id, in packed order
+        self._card_widgets = {}
+        self._card_order = []
+        self._empty_label = None
 
     def _open_custom_recur_dialog(self):
         d = ctk.CTkToplevel(self)
@@ -498,13 +972,13 @@ class ToDoZenApp(ctk.CTk):
             if days and days.strip().isdigit():
                 recur_extra["every_x_days"] = int(days.strip())
             if any(weekdays.values()):
-                recur_extra["weekdays"] = [i for i,flag in weekdays.items() if flag]
+                recur_extra["weekdays_mask"] = sum(1 << i for i,flag in weekdays.items() if flag)
         task = {
             "id": str(uuid4()),
             "user": self.current_user,
             "title": title,
             "category": cat,
-            "due": due.isoformat(),
+            "due": to_epoch(due),
             "created": datetime.utcnow().isoformat(),
             "done": False,
             "recurrence": recur,
@@ -512,90 +986,218 @@ class ToDoZenApp(ctk.CTk):
             "notified": False,
             "xp": 0
         }
-        self.storage.add_task(task)
+        self._cache_task(self.storage.add_task(task))
         self._toast(f"Added: {title}")
         self.entry_title.delete(0, "end")
-        self._load_tasks()
         self.render_task_list()
 
     def _load_tasks(self):
-        self.tasks = self.storage.list_tasks(user=self.current_user)
+        # full reload from storage; mutations update the cache in place instead
+        self.tasks_by_id = {}
+        self._reset_counts()
+        with self._due_lock:
+            self._due_heap.clear()
+        for t in self.storage.list_tasks(user=self.current_user):
+            self._cache_task(t)
+
+    def _cache_task(self, t):
         # convert types
-        for t in self.tasks:
-            t["notified"] = bool(t.get("notified"))
-            t["done"] = bool(t.get("done"))
+        t["notified"] = bool(t.get("notified"))
+        t["done"] = bool(t.get("done"))
+        t["recurrence_extra"] = decode_extra(t.get("recurrence_extra"))
+        t["_cat_xp"] = category_xp(t.get("category"))
+        old = self.tasks_by_id.get(t["id"])
+        if old:
+            self._count_task(old, -1)
+        self.tasks_by_id[t["id"]] = t
+        self._count_task(t, 1)
+        self._schedule_due(t)
+        return t
+
+    def _uncache_task(self, id_):
+        t = self.tasks_by_id.pop(id_, None)
+        if t:
+            self._count_task(t, -1)
+
+    # running aggregates for stats/analytics, so neither has to walk every task;
+    # bracket in-place edits of category/done/due with _count_task(t, -1)/(t, 1)
+    def _reset_counts(self):
+        self._count_by_cat = Counter()
+        self._count_by_due_date = Counter()
+        self._count_done = 0
+
+    def _count_task(self, t, sign):
+        self._bump(self._count_by_cat, t.get("category", "General"), sign)
+        self._count_done += sign if t.get("done") else 0
+        due = t["due"]
+        if due is not None:
+            self._bump(self._count_by_due_date, due_day(due), sign)
+
+    @staticmethod
+    def _bump(counter, key, sign):
+        # keys are dropped at zero, so the counters hold only live buckets and
+        # readers can use them as-is (snoozed-past dates don't pile up)
+        n = counter[key] + sign
+        if n:
+            counter[key] = n
+        else:
+            del counter[key]
 
     def render_task_list(self):
-        for w in self.tasks_list_frame.winfo_children():
-            w.destroy()
+        # diff against the cards already on screen: only new tasks get widgets, only
+        # removed tasks lose them, and cards are re-packed only if the order changed
         # sort by due
         def keyf(t):
-            dt = parse_iso(t.get("due"))
-            return dt or datetime.max
-        self.tasks.sort(key=keyf)
-        if not self.tasks:
-            ctk.CTkLabel(self.tasks_list_frame, text="No tasks yet — add something meaningful ✨").pack(pady=12)
+            return t["due"] if t["due"] is not None else DUE_NEVER
+        tasks = sorted(self.tasks_by_id.values(), key=keyf)
+        order = [t["id"] for t in tasks]
+        for id_ in set(self._card_widgets) - set(order):
+            self._card_widgets.pop(id_)["frame"].destroy()
+        if not tasks:
+            if self._empty_label is None:
+                self._empty_label = ctk.CTkLabel(self.tasks_list_frame, text="No tasks yet — add something meaningful ✨")
+                self._empty_label.pack(pady=12)
+            self._card_order = []
             return
-        for t in self.tasks:
-            self._render_task_card(t)
+        if self._empty_label is not None:
+            self._empty_label.destroy()
+            self._empty_label = None
+        new_cards = []
+        for t in tasks:
+            if t["id"] in self._card_widgets:
+                self._update_card(t["id"])
+            else:
+                self._card_widgets[t["id"]] = self._render_task_card(t)
+                new_cards.append(t["id"])
+        if order != self._card_order:
+            frames = [self._card_widgets[id_]["frame"] for id_ in order]
+            for f in frames:
+                f.pack_forget()
+            for f in frames:
+                f.pack(fill="x", padx=8, pady=6)
+            self._card_order = order
+        # animation
+        for id_ in new_cards:
+            self._animate_in(self._card_widgets[id_]["frame"])
+
+    def _card_texts(self, task):
+        title = task.get("title")
+        if task.get("done"):
+            title = "✅ " + title
+        due = task["due"]
+        meta = f"{task.get('category')} • Due: {human_dt(due) if due is not None else '—'} • Rec: {task.get('recurrence')}"
+        return title, meta
 
     def _render_task_card(self, task):
+        # builds the card widgets; render_task_list packs the frame
         f = ctk.CTkFrame(self.tasks_list_frame, corner_radius=8)
-        f.pack(fill="x", padx=8, pady=6)
         left = ctk.CTkFrame(f, fg_color="transparent")
         left.pack(side="left", fill="x", expand=True, padx=6, pady=6)
-        title = task.get("title")
-        if task.get("done"):
-            title = "✅ " + title
-        ctk.CTkLabel(left, text=title, font=("Helvetica", 13, "bold")).pack(anchor="w")
-        due = parse_iso(task.get("due"))
-        ctk.CTkLabel(left, text=f"{task.get('category')} • Due: {human_dt(due) if due else '—'} • Rec: {task.get('recurrence')}", font=("Helvetica", 10)).pack(anchor="w")
+        texts = self._card_texts(task)
+        title_lbl = ctk.CTkLabel(left, text=texts[0], font=("Helvetica", 13, "bold"))
+        title_lbl.pack(anchor="w")
+        meta_lbl = ctk.CTkLabel(left, text=texts[1], font=("Helvetica", 10))
+        meta_lbl.pack(anchor="w")
         right = ctk.CTkFrame(f, fg_color="transparent")
         right.pack(side="right", padx=6, pady=6)
-        ctk.CTkButton(right, text="✅/↩", width=70, command=partial(self._toggle_done, task.get("id"))).pack(side="right", padx=4)
-        ctk.CTkButton(right, text="✎", width=42, command=partial(self._open_edit_dialog, task.get("id"))).pack(side="right", padx=4)
-        ctk.CTkButton(right, text="🗑", width=42, fg_color="#ff6b6b", hover_color="#ff8080", command=partial(self._delete_task, task.get("id"))).pack(side="right", padx=4)
-        snooze_menu = ctk.CTkOptionMenu(right, values=[f"{m}m" for m in self.snooze_options], width=80, command=lambda val, id=task.get("id"): self._snooze_choice(id, val))
+        # no per-card callbacks: each control is tagged with its task id and action,
+        # and clicks on all cards go through one class binding (_on_card_click)
+        toggle_btn = ctk.CTkButton(right, text="✅/↩", width=70)
+        toggle_btn.pack(side="right", padx=4)
+        edit_btn = ctk.CTkButton(right, text="✎", width=42)
+        edit_btn.pack(side="right", padx=4)
+        delete_btn = ctk.CTkButton(right, text="🗑", width=42, fg_color="#ff6b6b", hover_color="#ff8080")
+        delete_btn.pack(side="right", padx=4)
+        snooze_menu = ctk.CTkOptionMenu(right, values=[f"{m}m" for m in self.snooze_options], width=80, command=self._on_snooze_pick)
         snooze_menu.set("Snooze")
         snooze_menu.pack(side="right", padx=6)
-        # animation
-        self._animate_in(f)
+        for action, w in (("toggle", toggle_btn), ("edit", edit_btn), ("delete", delete_btn), ("snooze", snooze_menu)):
+            w._task_id = task["id"]
+            w._action = action
+            for child in w.winfo_children():
+                child.bindtags((CARD_ACTION_TAG,) + child.bindtags())
+        return {"frame": f, "title": title_lbl, "meta": meta_lbl, "snooze": snooze_menu, "texts": texts}
+
+    def _on_card_click(self, event):
+        # the click lands on a ctk widget's inner canvas/label; walk up to the tagged control
+        w = event.widget
+        while w is not None and not hasattr(w, "_action"):
+            w = w.master
+        if w is None:
+            return
+        if w._action == "snooze":
+            # runs before the menu opens; the pick arrives in _on_snooze_pick
+            self._snooze_target = w._task_id
+            return
+        handler = {"toggle": self._toggle_done, "edit": self._open_edit_dialog, "delete": self._delete_task}[w._action]
+        handler(w._task_id)
+        return "break"  # the control may have been destroyed (delete)
+
+    def _on_snooze_pick(self, val):
+        id_ = self._snooze_target
+        card = self._card_widgets.get(id_)
+        if card:
+            card["snooze"].set("Snooze")
+        self._snooze_choice(id_, val)
+
+    def _update_card(self, id_):
+        # reconfigure only the labels whose text changed
+        card = self._card_widgets.get(id_)
+        task = self.tasks_by_id.get(id_)
+        if not card or not task:
+            return
+        texts = self._card_texts(task)
+        if texts == card["texts"]:
+            return
+        if texts[0] != card["texts"][0]:
+            card["title"].configure(text=texts[0])
+        if texts[1] != card["texts"][1]:
+            card["meta"].configure(text=texts[1])
+        card["texts"] = texts
 
     def _toggle_done(self, id_):
-        task = self.storage.get_task(id_)
+        task = self.tasks_by_id.get(id_)
         if not task:
             return
-        new_done = not bool(task.get("done"))
-        self.storage.update_task(id_, done=1 if new_done else 0)
+        new_done = not task.get("done")
+        self._count_task(task, -1)
+        task["done"] = new_done
+        self._count_task(task, 1)
+        user = self.storage.get_user(self.current_user) if new_done else None
+        if not user:
+            self.storage.update_task(id_, mongo_doc=stored_fields(task), done=1 if new_done else 0)
+        if not new_done:
+            self._schedule_due(task)
         if new_done:
             # award xp and coins
             xp = award_xp_for_task(task)
-            user = self.storage.get_user(self.current_user)
             if user:
                 new_coins = (user.get("coins") or 0) + math.floor(xp/5)
                 new_streak = (user.get("streak") or 0)
                 # simple streak logic
-                last = parse_iso(user.get("last_completed")) if user.get("last_completed") else None
+                last = parse_iso(user.get("last_completed"))
                 today = date.today()
-                if last and parse_iso(user.get("last_completed")).date() == today - timedelta(days=1):
+                if last and last.date() == today - timedelta(days=1):
                     new_streak += 1
-                elif last and parse_iso(user.get("last_completed")).date() == today:
+                elif last and last.date() == today:
                     # same day completed earlier -> streak unchanged
                     pass
                 else:
                     new_streak = 1
-                self.storage.update_user(self.current_user, coins=new_coins, streak=new_streak, last_completed=datetime.utcnow().isoformat())
-                # set xp on task
-                self.storage.update_task(id_, xp=xp)
+                # done flag, task xp and user rewards in one transaction
+                task["xp"] = xp
+                self.storage.complete_task(id_, xp, self.current_user, new_coins, new_streak, datetime.utcnow().isoformat())
             # schedule next recurrence if applicable
             if task.get("recurrence") and task.get("recurrence") != "none":
-                self._handle_recurrence_after_completion(task)
-        self._load_tasks()
-        self.render_task_list()
+                if self._handle_recurrence_after_completion(task):
+                    self.render_task_list()
+                    return
+        self._update_card(id_)
 
     def _handle_recurrence_after_completion(self, task):
         rec = task.get("recurrence")
-        due = parse_iso(task.get("due"))
+        # wall-clock arithmetic on the datetime, so "daily" keeps its hour across DST
+        due = from_epoch(task["due"])
         if not due:
             return
         next_due = None
@@ -606,37 +1208,24 @@ class ToDoZenApp(ctk.CTk):
         elif rec == "monthly":
             next_due = due + relativedelta(months=1)
         elif rec == "custom":
-            extra = json.loads(task.get("recurrence_extra") or "{}")
+            extra = task["recurrence_extra"]
             if extra.get("every_x_days"):
                 next_due = due + timedelta(days=int(extra["every_x_days"]))
-            elif extra.get("weekdays"):
-                # find next weekday in list (0=Mon..6=Sun)
-                wd = due.weekday()
-                days = extra["weekdays"]
-                # find next day in days list greater than current wd; else wrap
-                days_sorted = sorted(days)
-                found = None
-                for d in days_sorted:
-                    if d > wd:
-                        found = d
-                        break
-                if found is None:
-                    found = days_sorted[0]
-                    delta_days = (7 - wd) + found
-                else:
-                    delta_days = found - wd
-                next_due = due + timedelta(days=delta_days)
+            elif extra.get("weekdays_mask") or extra.get("weekdays"):
+                # bit i set = weekday i (0=Mon..6=Sun); older tasks stored a list
+                mask = extra.get("weekdays_mask") or sum(1 << d for d in set(extra["weekdays"]))
+                next_due = due + timedelta(days=NEXT_WEEKDAY_DELTA[due.weekday()][mask & 0x7F])
         if next_due:
             new_task = dict(task)
             new_task["id"] = str(uuid4())
-            new_task["due"] = next_due.isoformat()
+            set_due(new_task, next_due)
             new_task["done"] = False
             new_task["notified"] = False
             # persist
-            self.storage.add_task(new_task)
+            return self._cache_task(self.storage.add_task(new_task))
 
     def _open_edit_dialog(self, id_):
-        task = self.storage.get_task(id_)
+        task = self.tasks_by_id.get(id_)
         if not task:
             return
         d = ctk.CTkToplevel(self)
@@ -644,7 +1233,7 @@ class ToDoZenApp(ctk.CTk):
         d.geometry("420x220")
         ctk.CTkLabel(d, text=task.get("title"), font=("Helvetica", 12, "bold")).pack(pady=6)
         de = DateEntry(d)
-        due = parse_iso(task.get("due"))
+        due = from_epoch(task["due"])
         if due:
             de.set_date(due.date())
         de.pack(pady=6)
@@ -659,8 +1248,12 @@ class ToDoZenApp(ctk.CTk):
         def save_and_close():
             try:
                 newdt = datetime(de.get_date().year, de.get_date().month, de.get_date().day, int(hv.get()), int(mv.get()))
-                self.storage.update_task(id_, due=newdt.isoformat(), notified=0)
-                self._load_tasks()
+                self._count_task(task, -1)
+                set_due(task, newdt)
+                task["notified"] = False
+                self._count_task(task, 1)
+                self.storage.update_task(id_, mongo_doc=stored_fields(task), due=task["due"], notified=0)
+                self._schedule_due(task)
                 self.render_task_list()
             except Exception:
                 pass
@@ -669,22 +1262,25 @@ class ToDoZenApp(ctk.CTk):
 
     def _delete_task(self, id_):
         self.storage.delete_task(id_)
-        self._load_tasks()
+        self._uncache_task(id_)
         self.render_task_list()
 
     def _snooze_choice(self, id_, val):
         if not val or val == "Snooze":
             return
         mins = int(val.replace("m",""))
-        task = self.storage.get_task(id_)
+        task = self.tasks_by_id.get(id_)
         if not task:
             return
-        due = parse_iso(task.get("due"))
-        if not due:
+        if task["due"] is None:
             return
-        new_due = due + timedelta(minutes=mins)
-        self.storage.update_task(id_, due=new_due.isoformat(), notified=0)
-        self._load_tasks()
+        # one composite UPDATE computed from the cached task: no read before or after
+        self._count_task(task, -1)
+        task["due"] += mins * 60
+        task["notified"] = False
+        self._count_task(task, 1)
+        self.storage.update_task(id_, mongo_doc=stored_fields(task), due=task["due"], notified=0)
+        self._schedule_due(task)
         self.render_task_list()
         self._toast(f"Snoozed by {mins}m")
 
@@ -703,11 +1299,44 @@ class ToDoZenApp(ctk.CTk):
         self.stat_label.pack(pady=6)
         self.stat_text = ctk.CTkLabel(right, text="", anchor="w")
         self.stat_text.pack(pady=6)
-        # chart canvas (matplotlib)
+        # chart canvas (matplotlib) is created on the first refresh
+        self._chart_host = left
+        self.canvas = None
+        ctk.CTkButton(right, text="Refresh Stats", command=self._refresh_stats).pack(pady=8)
+
+    def _ensure_chart(self):
+        if self.canvas is not None:
+            return True
+        try:
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        except ImportError:
+            missing_module("matplotlib", "The dashboard chart")
+            return False
         self.fig, self.ax = plt.subplots(figsize=(5,3))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=left)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self._chart_host)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
-        ctk.CTkButton(right, text="Refresh Stats", command=self._refresh_stats).pack(pady=8)
+        self._pie = None
+        self._pie_labels = None
+        return True
+
+    def _update_pie(self, sizes):
+        # same layout as ax.pie(): counter-clockwise from 0°, labels at 1.1, pct at 0.6
+        wedges, texts, autotexts = self._pie
+        total = float(sum(sizes))
+        theta1 = 0.0
+        for wedge, text, autotext, size in zip(wedges, texts, autotexts, sizes):
+            frac = size / total
+            theta2 = theta1 + 360.0 * frac
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment("left" if x > 0 else "right")
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{frac * 100:1.1f}%")
+            theta1 = theta2
 
     def _build_analytics_tab(self):
         tab = self.tabs.tab("Analytics")
@@ -718,12 +1347,9 @@ class ToDoZenApp(ctk.CTk):
 
     def _recompute_analytics(self):
         # simple analytics: completion rate, by-category counts, streaks
-        tasks = self.storage.list_tasks(user=self.current_user)
-        total = len(tasks)
-        done = sum(1 for t in tasks if t.get("done"))
-        by_cat = {}
-        for t in tasks:
-            by_cat[t.get("category","General")] = by_cat.get(t.get("category","General"),0)+1
+        total = len(self.tasks_by_id)
+        done = self._count_done
+        by_cat = self._count_by_cat
         user = self.storage.get_user(self.current_user) or {}
         text = f"Total: {total}\nCompleted: {done}\nCompletion rate: { (done/total*100) if total else 0:.1f}%\n\nBy category:\n"
         for k,v in by_cat.items():
@@ -732,21 +1358,24 @@ class ToDoZenApp(ctk.CTk):
         self.analytics_text.configure(text=text)
 
     def _refresh_stats(self):
-        tasks = self.storage.list_tasks(user=self.current_user)
-        # build category pie
-        cats = {}
-        for t in tasks:
-            cats[t.get("category","General")] = cats.get(t.get("category","General"),0)+1
-        self.ax.clear()
-        labels = list(cats.keys()) or ["No tasks"]
-        sizes = list(cats.values()) or [1]
-        self.ax.pie(sizes, labels=labels, autopct="%1.1f%%")
-        self.ax.set_title("Tasks by Category")
-        self.canvas.draw()
+        # build category pie; while the categories stay the same only the
+        # existing wedges are re-angled, and Tk coalesces the repaint
+        if self._ensure_chart():
+            cats = self._count_by_cat
+            labels = list(cats.keys()) or ["No tasks"]
+            sizes = list(cats.values()) or [1]
+            if labels == self._pie_labels:
+                self._update_pie(sizes)
+            else:
+                self.ax.clear()
+                self._pie = self.ax.pie(sizes, labels=labels, autopct="%1.1f%%")
+                self._pie_labels = labels
+                self.ax.set_title("Tasks by Category")
+            self.canvas.draw_idle()
         # stats text
-        total = len(tasks)
-        pending = sum(1 for t in tasks if not t.get("done"))
-        due_today = sum(1 for t in tasks if parse_iso(t.get("due")) and parse_iso(t.get("due")).date()==date.today())
+        total = len(self.tasks_by_id)
+        pending = total - self._count_done
+        due_today = self._count_by_due_date[date.today()]
         self.stat_text.configure(text=f"Total: {total}\nPending: {pending}\nDue today: {due_today}")
 
     # -------------------------
@@ -768,10 +1397,13 @@ class ToDoZenApp(ctk.CTk):
         self.smtp_pass.pack(pady=4)
         ctk.CTkButton(tab, text="Send Test Email", command=self._send_test_email).pack(pady=6)
         # sync toggle
-        self.sync_var = ctk.BooleanVar(value=bool(self.storage.mongo_collection))
+        self.sync_var = ctk.BooleanVar(value=self.storage.mongo_sync)
         ctk.CTkCheckBox(tab, text="Sync to MongoDB (if available)", variable=self.sync_var, command=self._toggle_sync).pack(pady=6)
+        # durability vs. throughput
+        self.fast_writes_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Fast writes (less crash-safe)", variable=self.fast_writes_var, command=self._toggle_fast_writes).pack(pady=6)
         # tray toggle
-        self.tray_var = ctk.BooleanVar(value=True if pystray else False)
+        self.tray_var = ctk.BooleanVar(value=has_module("pystray") and has_module("PIL"))
         ctk.CTkCheckBox(tab, text="Enable System Tray", variable=self.tray_var).pack(pady=6)
 
     def _export_backup(self):
@@ -779,96 +1411,233 @@ class ToDoZenApp(ctk.CTk):
         self._toast(f"Exported to {path}")
 
     def _import_backup(self):
-        # simple: read JSON_BACKUP if exists
-        if not os.path.exists(JSON_BACKUP):
+        # read JSON_BACKUP if it exists, else the newest older backup format found
+        path = next((p for p in (JSON_BACKUP, *LEGACY_JSON_BACKUPS) if os.path.exists(p)), None)
+        if not path:
             self._toast("No backup file found.")
             return
-        self.storage.import_json(JSON_BACKUP)
-        self._toast("Imported backup.")
-        self._load_tasks()
-        self.render_task_list()
 
-    def _send_test_email(self):
+        def progress(n):
+            if n % (IMPORT_BATCH * 10) == 0:
+                self._toast(f"Importing… {n} tasks")
+                self.update_idletasks()
+
+        n = self.storage.import_json(path, progress=progress)
+        self._toast(f"Imported {n} tasks from backup.")
+        self._schedule_render(reload=True)
+
+    def _get_smtp(self, server, user, pw):
+        # reuse the open session while its settings match and it still answers
+        # NOOP; otherwise connect + STARTTLS + login once. Call with _smtp_lock held.
         import smtplib
+        key = (server, user, pw)
+        if self._smtp is not None and self._smtp_key == key:
+            try:
+                self._smtp.noop()
+                self._smtp.rset()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._close_smtp()
+        s = smtplib.SMTP(server, 587, timeout=10)
+        try:
+            s.starttls()
+            s.login(user, pw)
+        except Exception:
+            s.close()
+            raise
+        self._smtp, self._smtp_key = s, key
+        return s
+
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+        self._smtp = self._smtp_key = None
+
+    def _maybe_init_event_loop(self):
+        if self._aio_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            self._aio_loop = loop
+        return self._aio_loop
+
+    async def _get_async_smtp(self, server, user, pw):
+        # aiosmtplib twin of _get_smtp; runs on _aio_loop, so no lock is needed
+        import aiosmtplib
+        key = (server, user, pw)
+        if self._asmtp is not None and self._asmtp_key == key and self._asmtp.is_connected:
+            try:
+                await self._asmtp.noop()
+                await self._asmtp.rset()
+                return self._asmtp
+            except (aiosmtplib.SMTPException, OSError):
+                pass
+        await self._close_async_smtp()
+        s = aiosmtplib.SMTP(hostname=server, port=587, start_tls=True, username=user, password=pw, timeout=10)
+        await s.connect()
+        self._asmtp, self._asmtp_key = s, key
+        return s
+
+    async def _close_async_smtp(self):
+        if self._asmtp is not None:
+            try:
+                await self._asmtp.quit()
+            except Exception:
+                self._asmtp.close()
+        self._asmtp = self._asmtp_key = None
+
+    async def _send_email_async(self, server, user, pw, to, message):
+        try:
+            s = await self._get_async_smtp(server, user, pw)
+            await s.sendmail(user, [to], message)
+        except Exception:
+            await self._close_async_smtp()
+            raise
+
+    def _send_test_email(self):
         server = self.smtp_server.get().strip()
         user = self.smtp_user.get().strip()
         pw = self.smtp_pass.get().strip()
         if not server or not user or not pw:
             self._toast("Fill SMTP settings first.")
             return
-        try:
-            with smtplib.SMTP(server, 587, timeout=10) as s:
-                s.starttls()
-                s.login(user, pw)
-                s.sendmail(user, user, "Subject: ToDoZen Test\n\nThis is a test email from ToDoZen.")
-            self._toast("Test email sent.")
-        except Exception as e:
-            self._toast(f"Email failed: {e}")
+        self._toast("Sending test email…")
+        message = "Subject: ToDoZen Test\n\nThis is a test email from ToDoZen."
+
+        def _report(exc):
+            self.after(0, self._toast, "Test email sent." if exc is None else f"Email failed: {exc}")
+
+        if has_module("aiosmtplib"):
+            # awaits on the shared loop thread instead of parking a thread per send
+            fut = asyncio.run_coroutine_threadsafe(
+                self._send_email_async(server, user, pw, user, message), self._maybe_init_event_loop())
+            fut.add_done_callback(lambda f: _report(f.exception()))
+            return
+
+        # blocking smtplib fallback: several round-trips, so keep it off the Tk thread
+        def _send():
+            try:
+                with self._smtp_lock:
+                    s = self._get_smtp(server, user, pw)
+                    s.sendmail(user, user, message)
+                _report(None)
+            except Exception as e:
+                with self._smtp_lock:
+                    self._close_smtp()
+                _report(e)
+        threading.Thread(target=_send, daemon=True).start()
 
     def _toggle_sync(self):
         if self.sync_var.get():
-            self.storage._init_mongo_if_available()
-            if self.storage.mongo_collection:
-                self._toast("Mongo sync enabled.")
-            else:
-                self._toast("Mongo not available.")
+            self._toast("Connecting to Mongo…")
+            self.storage.set_mongo_sync(True, on_ready=lambda ok: self.after(0, self._on_sync_ready, ok))
         else:
+            self.storage.set_mongo_sync(False)
             self._toast("Mongo sync disabled.")
 
+    def _on_sync_ready(self, ok):
+        if not ok:
+            self.sync_var.set(False)
+        self._toast("Mongo sync enabled." if ok else "Mongo not available.")
+
+    def _toggle_fast_writes(self):
+        self.storage.set_fast_writes(self.fast_writes_var.get())
+        self._toast("Fast writes on." if self.fast_writes_var.get() else "Fast writes off.")
+
     # -------------------------
     # Voice quick-add
     # -------------------------
     def _voice_add(self):
         self._toast("Listening...")
+        # only the blocking recognition runs on the worker; the task is built,
+        # stored and rendered back on the Tk thread
         def _do_listen():
             try:
                 text = speech_to_text()
-                if text:
-                    # naive parse: "Title at YYYY-mm-dd HH:MM" or just title
-                    title = text
-                    # add as task at tomorrow 9am if no datetime found
-                    due = datetime.now() + timedelta(days=1)
-                    task = {"id": str(uuid4()), "user": self.current_user, "title": title, "category":"Personal",
-                            "due": due.isoformat(), "created": datetime.utcnow().isoformat(), "done": False,
-                            "recurrence": "none", "recurrence_extra": {}, "notified": False}
-                    self.storage.add_task(task)
-                    self._load_tasks()
-                    self.render_task_list()
-                    self._toast(f"Added (voice): {title}")
-                    tts_speak("Task added.")
-                else:
-                    self._toast("Couldn't hear clearly.")
             except Exception:
-                self._toast("Voice add failed.")
+                self.after(0, self._toast, "Voice add failed.")
+                return
+            self.after(0, self._finish_voice_add, text)
         threading.Thread(target=_do_listen, daemon=True).start()
 
+    def _finish_voice_add(self, text):
+        if not text:
+            self._toast("Couldn't hear clearly.")
+            return
+        # naive parse: "Title at YYYY-mm-dd HH:MM" or just title
+        title = text
+        # add as task at tomorrow 9am if no datetime found
+        due = datetime.now() + timedelta(days=1)
+        task = {"id": str(uuid4()), "user": self.current_user, "title": title, "category":"Personal",
+                "due": to_epoch(due), "created": datetime.utcnow().isoformat(), "done": False,
+                "recurrence": "none", "recurrence_extra": {}, "notified": False}
+        self._cache_task(self.storage.add_task(task))
+        self._schedule_render()
+        self._toast(f"Added (voice): {title}")
+        threading.Thread(target=tts_speak, args=("Task added.",), daemon=True).start()
+
     # -------------------------
     # Notifier loop: check due tasks and show notifications
     # -------------------------
+    def _schedule_due(self, task):
+        due = task.get("due")
+        if due is None or task.get("done") or task.get("notified"):
+            return
+        entry = (due, task["id"])
+        with self._due_lock:
+            heapq.heappush(self._due_heap, entry)
+            earliest = self._due_heap[0] == entry
+        if earliest:
+            self._due_wake.set()
+
     def _notifier_loop(self):
+        # the heap only decides when to wake: stale entries (task changed since it
+        # was pushed) just cause an extra wake, since what fires is whatever the
+        # indexed due-window query returns
         while not self._stop_thread.is_set():
             try:
-                now = datetime.now()
-                tasks = self.storage.list_tasks(user=self.current_user)
-                for t in tasks:
-                    if t.get("done"):
-                        continue
-                    if t.get("notified"):
-                        continue
-                    due = parse_iso(t.get("due"))
-                    if not due:
-                        continue
-                    window_start = now - timedelta(minutes=1)
-                    window_end = now + timedelta(minutes=0)
-                    if window_start <= due <= window_end:
-                        send_desktop_notification(f"ToDoZen • {t.get('title')}", f"{t.get('category')} — due {human_dt(due)}")
-                        # mark notified and open small in-app action
-                        self.storage.update_task(t.get("id"), notified=1)
-                        self._show_due_popup(t)
-                time.sleep(NOTIFY_CHECK_INTERVAL)
+                self._due_wake.clear()
+                # one clock read per tick serves both the sleep and the due window
+                now = time.time()
+                with self._due_lock:
+                    heap = self._due_heap
+                    wait = heap[0][0] - now if heap else NOTIFY_CHECK_INTERVAL
+                    while heap and heap[0][0] <= now:
+                        heapq.heappop(heap)
+                if wait > 0:
+                    self._due_wake.wait(min(wait, NOTIFY_CHECK_INTERVAL))
+                    continue
+                now = int(now)
+                fired = self.storage.list_due_between(self.current_user, now - NOTIFY_LATE_GRACE, now)
+                for t in fired:
+                    send_desktop_notification(f"ToDoZen • {t.get('title')}", f"{t.get('category')} — due {human_dt(t['due'])}")
+                # mark the whole tick notified at once; the in-app action is shown from the Tk thread
+                self.storage.mark_notified(fired)
+                for t in fired:
+                    self._notify_q.put((t, "due"))
             except Exception:
                 traceback.print_exc()
-                time.sleep(5)
+                if self._stop_thread.wait(5):
+                    break
+
+    def _drain_notifier_queue(self):
+        try:
+            while True:
+                try:
+                    t, reason = self._notify_q.get_nowait()
+                except queue.Empty:
+                    break
+                cached = self.tasks_by_id.get(t.get("id"))
+                if cached:
+                    cached["notified"] = True
+                if reason == "due":
+                    self._show_due_popup(t)
+        finally:
+            if not self._stop_thread.is_set():
+                self.after(NOTIFY_DRAIN_MS, self._drain_notifier_queue)
 
     def _show_due_popup(self, task):
         try:
@@ -876,14 +1645,21 @@ class ToDoZenApp(ctk.CTk):
             top.title("Task Due")
             top.geometry("360x140")
             ctk.CTkLabel(top, text=f"⏰ {task.get('title')}", font=("Helvetica", 12, "bold")).pack(pady=6)
-            due = parse_iso(task.get("due"))
-            ctk.CTkLabel(top, text=f"Due: {human_dt(due)}", font=("Helvetica", 10)).pack()
+            ctk.CTkLabel(top, text=f"Due: {human_dt(task.get('due'))}", font=("Helvetica", 10)).pack()
             frame = ctk.CTkFrame(top, fg_color="transparent")
             frame.pack(pady=8)
-            ctk.CTkButton(frame, text="Snooze 10m", command=lambda: [self._snooze_choice(task.get("id"), "10m"), top.destroy()]).pack(side="left", padx=4)
-            ctk.CTkButton(frame, text="Snooze 30m", command=lambda: [self._snooze_choice(task.get("id"), "30m"), top.destroy()]).pack(side="left", padx=4)
-            ctk.CTkButton(frame, text="Mark Done", command=lambda: [self._toggle_done(task.get("id")), top.destroy()]).pack(side="left", padx=4)
-            top.after(20000, lambda: top.destroy())
+            auto_close = top.after(20000, top.destroy)
+
+            def close(action=None):
+                # closing early must also drop the pending auto-destroy
+                top.after_cancel(auto_close)
+                if action:
+                    action()
+                top.destroy()
+            ctk.CTkButton(frame, text="Snooze 10m", command=lambda: close(lambda: self._snooze_choice(task.get("id"), "10m"))).pack(side="left", padx=4)
+            ctk.CTkButton(frame, text="Snooze 30m", command=lambda: close(lambda: self._snooze_choice(task.get("id"), "30m"))).pack(side="left", padx=4)
+            ctk.CTkButton(frame, text="Mark Done", command=lambda: close(lambda: self._toggle_done(task.get("id")))).pack(side="left", padx=4)
+            top.protocol("WM_DELETE_WINDOW", close)
         except Exception:
             pass
 
@@ -891,37 +1667,71 @@ class ToDoZenApp(ctk.CTk):
     # Little utilities & UI niceties
     # -------------------------
     def _toast(self, text):
-        t = ctk.CTkToplevel(self)
-        t.overrideredirect(True)
-        x = self.winfo_rootx() + 80
-        y = self.winfo_rooty() + 80
-        t.geometry(f"300x60+{x}+{y}")
-        ctk.CTkLabel(t, text=text).pack(fill="both", expand=True, padx=12, pady=12)
-        t.after(1400, lambda: t.destroy())
+        # one borderless window serves every toast: retext, show, hide again.
+        # A toast arriving while one is visible replaces it and restarts the timer.
+        if self._toast_win is None:
+            self._toast_win = ctk.CTkToplevel(self)
+            self._toast_win.overrideredirect(True)
+            self._toast_lbl = ctk.CTkLabel(self._toast_win, text="")
+            self._toast_lbl.pack(fill="both", expand=True, padx=12, pady=12)
+        self._toast_lbl.configure(text=text)
+        if self._root_origin is None:
+            self._root_origin = (self.winfo_rootx(), self.winfo_rooty())
+        x = self._root_origin[0] + 80
+        y = self._root_origin[1] + 80
+        self._toast_win.geometry(f"300x60+{x}+{y}")
+        self._toast_win.deiconify()
+        self._toast_win.lift()
+        if self._toast_job is not None:
+            self.after_cancel(self._toast_job)
+        self._toast_job = self.after(1400, self._hide_toast)
+
+    def _cache_origin(self, event):
+        # every child's <Configure> also reaches the root's bindtag; only the
+        # window's own events can move it
+        if event.widget is self:
+            self._root_origin = (self.winfo_rootx(), self.winfo_rooty())
+
+    def _hide_toast(self):
+        self._toast_job = None
+        self._toast_win.withdraw()
 
     def _animate_in(self, widget, steps=6, delay=10):
-        def step(i):
-            pad = int(30 * (1 - (i/steps)))
+        # progress follows the clock, and every animating card moves in the same
+        # tick: one after() per frame however many cards a render added
+        self._animating[widget] = (time.monotonic(), steps * delay / 1000)
+        if self._animate_job is None:
+            self._animate_tick()
+
+    def _animate_tick(self):
+        self._animate_job = None
+        now = time.monotonic()
+        for widget, (start, total) in list(self._animating.items()):
+            f = min(1.0, (now - start) / total)
             try:
-                widget.pack_configure(padx=pad)
-                if i < steps:
-                    widget.after(delay, lambda: step(i+1))
+                widget.pack_configure(padx=int(30 * (1 - f)))
             except Exception:
-                pass
-        step(0)
+                f = 1.0  # widget destroyed mid-animation
+            if f >= 1.0:
+                del self._animating[widget]
+        if self._animating:
+            self._animate_job = self.after(ANIMATE_FRAME_MS, self._animate_tick)
 
     # -------------------------
     # System Tray (optional)
     # -------------------------
     def _maybe_init_tray_icon(self):
-        if not pystray or not self.tray_var.get():
+        if not self.tray_var.get():
+            return
+        try:
+            import pystray
+            from PIL import Image
+        except ImportError:
+            missing_module("pystray pillow", "The system tray icon")
             return
         # create simple icon
         def create_image():
-            img = Image.new('RGB', (64,64), color=(0,0,0))
-            d = ImageDraw.Draw(img)
-            d.ellipse((8,8,56,56), fill=(43,156,255))
-            return img
+            return Image.frombytes("RGB", TRAY_ICON_SIZE, TRAY_ICON_BYTES)
         image = create_image()
         menu = pystray.Menu(
             pystray.MenuItem('Open', lambda : self.deiconify()),
@@ -955,10 +1765,40 @@ class ToDoZenApp(ctk.CTk):
     # -------------------------
     # Close / lifecycle
     # -------------------------
+    def _schedule_render(self, reload=False):
+        # Tk thread only; reload=True refetches the cache from storage before rendering
+        self._render_reload = self._render_reload or reload
+        if self._render_job is None:
+            self._render_job = self.after(RENDER_COALESCE_MS, self._do_render)
+
+    def _do_render(self):
+        self._render_job = None
+        if self._render_reload:
+            self._render_reload = False
+            self._load_tasks()
+        self.render_task_list()
+
+    def _schedule_storage_flush(self):
+        if self._storage_flush_job is None:
+            self._storage_flush_job = self.after(WRITE_BATCH_MS, self._flush_storage)
+
+    def _flush_storage(self):
+        self._storage_flush_job = None
+        self.storage.flush()
+
     def on_close(self):
         self._stop_thread.set()
+        self._due_wake.set()  # the notifier may be parked until the next due time
+        with self._smtp_lock:
+            self._close_smtp()
+        if self._aio_loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_async_smtp(), self._aio_loop).result(timeout=2)
+            except Exception:
+                pass
+            self._aio_loop.call_soon_threadsafe(self._aio_loop.stop)
         try:
-            self.storage.conn.close()
+            self.storage.close()
         except Exception:
             pass
         self.destroy()